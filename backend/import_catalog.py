@@ -0,0 +1,168 @@
+"""Stream a large catalog file into MongoDB.
+
+Usage:
+    python import_catalog.py items.jsonl
+    python import_catalog.py items.csv --category movies --batch-size 2000
+
+Rows need ``name`` and ``name_ar``; ``category`` can come from the row or
+``--category``, and an optional positive ``weight`` biases editorial picks.
+Every row is validated against the ``CatalogItem`` schema and upserted by id
+(deterministic from category and name when the row has none), so re-running
+an import is safe. Progress is checkpointed next to the input
+file and an interrupted import resumes from the last fully written row.
+When the import ends, even on failure, the catalog versions of the categories
+it wrote are bumped, and running servers reload those categories within
+``CATALOG_POLL_SECONDS``.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Union
+
+from pydantic import ValidationError
+from pymongo import UpdateOne
+
+from server import (CATEGORIES, BulkWriter, CatalogItem, bump_catalog_versions, catalog_item_id, client,
+                    derive_fields)
+
+logger = logging.getLogger("import_catalog")
+
+
+def read_rows(path: Path):
+    """Yield raw rows from a CSV or JSON Lines file, one at a time.
+
+    JSON lines are yielded unparsed so that a malformed line is rejected by
+    ``to_document`` like any other invalid row instead of ending the import.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if v not in ("", None)}
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def to_document(row: Union[dict, str], default_category: str) -> dict:
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("row is not a JSON object")
+    row.setdefault("category", default_category)
+    if not isinstance(row["category"], str) or row["category"] not in CATEGORIES:
+        raise ValueError(f"unknown category {row.get('category')!r}")
+    if "name" in row and "id" not in row:
+        row["id"] = catalog_item_id(row["category"], row["name"])
+    return derive_fields(CatalogItem.model_validate(row).model_dump(exclude_none=True))
+
+
+class Checkpoint:
+    """Tracks the longest prefix of rows whose batches have all been written"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.committed = int(path.read_text()) if path.exists() else 0
+        self._done = {}
+
+    def batch_done(self, start: int, end: int):
+        self._done[start] = end
+        while self.committed in self._done:
+            self.committed = self._done.pop(self.committed)
+        self.path.write_text(str(self.committed))
+
+
+async def import_catalog(path: Path, category: str, batch_size: int, concurrency: int, restart: bool):
+    checkpoint = Checkpoint(path.with_name(path.name + ".checkpoint"))
+    if restart:
+        checkpoint.committed = 0
+    skip = checkpoint.committed
+    if skip:
+        logger.info("Resuming after row %d", skip)
+
+    writer = BulkWriter(concurrency)
+    stats = {"read": 0, "written": 0, "invalid": 0}
+    written = set()
+    pending = {name: [] for name in CATEGORIES}
+    batch_start = skip
+    started = last_report = time.monotonic()
+
+    async def flush(end: int):
+        """Write rows (batch_start, end]; the checkpoint moves once all their writes land"""
+        nonlocal batch_start
+        start, writes = batch_start, [(name, reqs) for name, reqs in pending.items() if reqs]
+        remaining = len(writes)
+
+        def on_done(name, size):
+            def callback():
+                nonlocal remaining
+                written.add(name)
+                stats["written"] += size
+                remaining -= 1
+                if not remaining:
+                    checkpoint.batch_done(start, end)
+            return callback
+
+        for name in pending:
+            pending[name] = []
+        batch_start = end
+        if not writes:
+            checkpoint.batch_done(start, end)
+        for name, reqs in writes:
+            await writer.submit(name, reqs, on_done(name, len(reqs)))
+
+    row_number = skip
+    try:
+        for row_number, row in enumerate(read_rows(path), start=1):
+            if row_number <= skip:
+                continue
+            stats["read"] += 1
+            try:
+                doc = to_document(row, category)
+            except (ValidationError, ValueError) as exc:
+                stats["invalid"] += 1
+                if stats["invalid"] <= 10:
+                    logger.warning("Row %d skipped: %s", row_number, exc)
+                continue
+            pending[doc["category"]].append(UpdateOne({"id": doc["id"]}, {"$set": doc}, upsert=True))
+            if sum(len(reqs) for reqs in pending.values()) >= batch_size:
+                await flush(row_number)
+            now = time.monotonic()
+            if now - last_report >= 5:
+                logger.info("%d rows read, %d written, %d invalid, %.0f rows/s",
+                            stats["read"], stats["written"], stats["invalid"], stats["read"] / (now - started))
+                last_report = now
+        await flush(row_number)
+        await writer.wait()
+    finally:
+        if written:
+            await bump_catalog_versions(written)
+    checkpoint.path.unlink(missing_ok=True)
+
+    elapsed = time.monotonic() - started
+    logger.info("Imported %d items (%d invalid rows) in %.1fs, %.0f rows/s",
+                stats["written"], stats["invalid"], elapsed, stats["read"] / max(elapsed, 1e-9))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a CSV or JSON Lines catalog into MongoDB")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--category", default="", help="category for rows that do not name one")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4, help="bulk writes in flight at once")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(import_catalog(args.path, args.category, args.batch_size, args.concurrency, args.restart))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
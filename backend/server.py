@@ -1,22 +1,43 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Response
 from dotenv import load_dotenv
+from fastapi.responses import StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 import os
 import logging
 import random
+import re
+import base64
+import bisect
+import functools
+import hashlib
+import heapq
+import json
+import operator
+import secrets
+import time
+import unicodedata
+import collections.abc
+import contextlib
+from collections import OrderedDict
 from pathlib import Path
+from urllib.parse import quote_plus
+import numpy as np
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import asyncio
 import uuid
-from datetime import datetime, timezone
+import zlib
+from datetime import datetime, timedelta, timezone
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -47,14 +68,32 @@ class Suggestion(BaseModel):
     image_url: Optional[str] = None
     external_url: Optional[str] = None
 
+class CatalogItem(Suggestion):
+    """A catalog document as ingested; weight biases editorial weighting"""
+    weight: Optional[float] = Field(None, gt=0)
+
 class SuggestionResponse(BaseModel):
     suggestion: Suggestion
     total_in_category: int
+    session: Optional[str] = None
+    seen: Optional[str] = None
+
+class SuggestionBatchResponse(BaseModel):
+    suggestions: List[Suggestion]
+    total_in_category: int
+    session: Optional[str] = None
+    seen: Optional[str] = None
 
 class FavoriteCreate(BaseModel):
     item_id: str
     category: str
 
+class FavoriteBatchCreate(BaseModel):
+    items: List[FavoriteCreate] = Field(max_length=200)
+
+class FavoriteIds(BaseModel):
+    item_ids: List[str] = Field(max_length=200)
+
 class Favorite(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -67,10 +106,9 @@ class Favorite(BaseModel):
     external_url: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-# Large database of real entertainment items
 # Helper function to generate external URLs
 def get_external_url(name: str, category: str) -> str:
-    encoded_name = name.replace(" ", "+")
+    encoded_name = quote_plus(name)
     if category == "games":
         return f"https://www.google.com/search?q={encoded_name}+game"
     elif category == "movies":
@@ -81,441 +119,1125 @@ def get_external_url(name: str, category: str) -> str:
         return f"https://www.youtube.com/results?search_query={encoded_name}"
     return f"https://www.google.com/search?q={encoded_name}"
 
-ENTERTAINMENT_DATA = {
-    "games": [
-        {"name": "The Legend of Zelda: Breath of the Wild", "name_ar": "أسطورة زيلدا: نفس البرية", "year": 2017, "genre": "مغامرات"},
-        {"name": "Red Dead Redemption 2", "name_ar": "ريد ديد ريدمبشن 2", "year": 2018, "genre": "أكشن/مغامرات"},
-        {"name": "God of War", "name_ar": "إله الحرب", "year": 2018, "genre": "أكشن/مغامرات"},
-        {"name": "The Witcher 3: Wild Hunt", "name_ar": "الساحر 3: الصيد البري", "year": 2015, "genre": "RPG"},
-        {"name": "Elden Ring", "name_ar": "إلدن رينج", "year": 2022, "genre": "RPG/أكشن"},
-        {"name": "Grand Theft Auto V", "name_ar": "جراند ثفت أوتو 5", "year": 2013, "genre": "أكشن/مغامرات"},
-        {"name": "Minecraft", "name_ar": "ماينكرافت", "year": 2011, "genre": "بناء/مغامرات"},
-        {"name": "Fortnite", "name_ar": "فورتنايت", "year": 2017, "genre": "باتل رويال"},
-        {"name": "Call of Duty: Warzone", "name_ar": "كول أوف ديوتي: وارزون", "year": 2020, "genre": "باتل رويال/FPS"},
-        {"name": "FIFA 24", "name_ar": "فيفا 24", "year": 2023, "genre": "رياضة"},
-        {"name": "Hogwarts Legacy", "name_ar": "إرث هوجوورتس", "year": 2023, "genre": "RPG/مغامرات"},
-        {"name": "Spider-Man 2", "name_ar": "سبايدرمان 2", "year": 2023, "genre": "أكشن/مغامرات"},
-        {"name": "Baldur's Gate 3", "name_ar": "بوابة بالدور 3", "year": 2023, "genre": "RPG"},
-        {"name": "Cyberpunk 2077", "name_ar": "سايبربانك 2077", "year": 2020, "genre": "RPG/أكشن"},
-        {"name": "Horizon Forbidden West", "name_ar": "هورايزن فوربيدن ويست", "year": 2022, "genre": "أكشن/مغامرات"},
-        {"name": "Ghost of Tsushima", "name_ar": "شبح تسوشيما", "year": 2020, "genre": "أكشن/مغامرات"},
-        {"name": "Sekiro: Shadows Die Twice", "name_ar": "سيكيرو: الظلال تموت مرتين", "year": 2019, "genre": "أكشن/مغامرات"},
-        {"name": "Hades", "name_ar": "هاديس", "year": 2020, "genre": "روجلايك/أكشن"},
-        {"name": "Stardew Valley", "name_ar": "ستاردو فالي", "year": 2016, "genre": "محاكاة/زراعة"},
-        {"name": "Among Us", "name_ar": "أمونج أس", "year": 2018, "genre": "اجتماعية/خداع"},
-        {"name": "Valorant", "name_ar": "فالورانت", "year": 2020, "genre": "FPS/تكتيكية"},
-        {"name": "League of Legends", "name_ar": "ليج أوف ليجندز", "year": 2009, "genre": "MOBA"},
-        {"name": "Apex Legends", "name_ar": "أبيكس ليجندز", "year": 2019, "genre": "باتل رويال"},
-        {"name": "Overwatch 2", "name_ar": "أوفرواتش 2", "year": 2022, "genre": "FPS/فريقي"},
-        {"name": "The Last of Us Part II", "name_ar": "ذا لاست أوف أس الجزء 2", "year": 2020, "genre": "أكشن/مغامرات"},
-        {"name": "Animal Crossing: New Horizons", "name_ar": "أنيمال كروسينج: نيو هورايزنز", "year": 2020, "genre": "محاكاة"},
-        {"name": "Dark Souls III", "name_ar": "دارك سولز 3", "year": 2016, "genre": "RPG/أكشن"},
-        {"name": "Resident Evil Village", "name_ar": "ريزدنت إيفل فيليج", "year": 2021, "genre": "رعب/أكشن"},
-        {"name": "Final Fantasy XVI", "name_ar": "فاينال فانتسي 16", "year": 2023, "genre": "RPG/أكشن"},
-        {"name": "Diablo IV", "name_ar": "ديابلو 4", "year": 2023, "genre": "RPG/أكشن"},
-        {"name": "Monster Hunter: World", "name_ar": "مونستر هنتر: وورلد", "year": 2018, "genre": "أكشن/RPG"},
-        {"name": "Persona 5 Royal", "name_ar": "بيرسونا 5 رويال", "year": 2020, "genre": "RPG"},
-        {"name": "Death Stranding", "name_ar": "ديث ستراندينج", "year": 2019, "genre": "أكشن/مغامرات"},
-        {"name": "Control", "name_ar": "كونترول", "year": 2019, "genre": "أكشن/مغامرات"},
-        {"name": "It Takes Two", "name_ar": "إت تيكس تو", "year": 2021, "genre": "مغامرات/تعاوني"},
-        {"name": "Hollow Knight", "name_ar": "هولو نايت", "year": 2017, "genre": "ميتروديفانيا"},
-        {"name": "Celeste", "name_ar": "سيليست", "year": 2018, "genre": "منصات"},
-        {"name": "Terraria", "name_ar": "تيراريا", "year": 2011, "genre": "بناء/مغامرات"},
-        {"name": "Rocket League", "name_ar": "روكت ليج", "year": 2015, "genre": "رياضة/سيارات"},
-        {"name": "Subnautica", "name_ar": "سابنوتيكا", "year": 2018, "genre": "مغامرات/بقاء"},
-        {"name": "Dead Cells", "name_ar": "ديد سيلز", "year": 2018, "genre": "روجلايك/أكشن"},
-        {"name": "Ori and the Will of the Wisps", "name_ar": "أوري وإرادة الأشباح", "year": 2020, "genre": "منصات/مغامرات"},
-        {"name": "Disco Elysium", "name_ar": "ديسكو إليسيوم", "year": 2019, "genre": "RPG"},
-        {"name": "Halo Infinite", "name_ar": "هالو إنفينيت", "year": 2021, "genre": "FPS"},
-        {"name": "Genshin Impact", "name_ar": "جينشن إمباكت", "year": 2020, "genre": "RPG/أكشن"},
-        {"name": "Sea of Thieves", "name_ar": "سي أوف ثيفز", "year": 2018, "genre": "مغامرات/متعدد"},
-        {"name": "No Man's Sky", "name_ar": "نو مانز سكاي", "year": 2016, "genre": "استكشاف/بقاء"},
-        {"name": "Destiny 2", "name_ar": "ديستني 2", "year": 2017, "genre": "FPS/MMO"},
-        {"name": "Doom Eternal", "name_ar": "دوم إيترنال", "year": 2020, "genre": "FPS"},
-        {"name": "Ratchet & Clank: Rift Apart", "name_ar": "راتشت وكلانك: ريفت أبارت", "year": 2021, "genre": "أكشن/منصات"},
-        {"name": "Returnal", "name_ar": "ريترنال", "year": 2021, "genre": "روجلايك/TPS"},
-        {"name": "Deathloop", "name_ar": "ديثلوب", "year": 2021, "genre": "أكشن/FPS"},
-        {"name": "Psychonauts 2", "name_ar": "سايكونوتس 2", "year": 2021, "genre": "منصات/مغامرات"},
-        {"name": "Metroid Dread", "name_ar": "ميترويد دريد", "year": 2021, "genre": "ميتروديفانيا"},
-        {"name": "Tales of Arise", "name_ar": "تيلز أوف أرايز", "year": 2021, "genre": "RPG"},
-        {"name": "Guilty Gear Strive", "name_ar": "جيلتي جير سترايف", "year": 2021, "genre": "قتال"},
-        {"name": "Street Fighter 6", "name_ar": "ستريت فايتر 6", "year": 2023, "genre": "قتال"},
-        {"name": "Mortal Kombat 1", "name_ar": "مورتال كومبات 1", "year": 2023, "genre": "قتال"},
-        {"name": "Tekken 8", "name_ar": "تيكن 8", "year": 2024, "genre": "قتال"},
-        {"name": "Palworld", "name_ar": "بال وورلد", "year": 2024, "genre": "بقاء/مغامرات"},
-        {"name": "Lethal Company", "name_ar": "ليثال كومباني", "year": 2023, "genre": "رعب/تعاوني"},
-        {"name": "Alan Wake 2", "name_ar": "آلان ويك 2", "year": 2023, "genre": "رعب/أكشن"},
-        {"name": "Lies of P", "name_ar": "أكاذيب بي", "year": 2023, "genre": "RPG/أكشن"},
-        {"name": "Starfield", "name_ar": "ستارفيلد", "year": 2023, "genre": "RPG/فضاء"},
-        {"name": "Armored Core VI", "name_ar": "أرمورد كور 6", "year": 2023, "genre": "أكشن/ميكا"},
-        {"name": "Remnant 2", "name_ar": "ريمنانت 2", "year": 2023, "genre": "أكشن/RPG"},
-        {"name": "Dave the Diver", "name_ar": "ديف الغواص", "year": 2023, "genre": "مغامرات/محاكاة"},
-        {"name": "Pikmin 4", "name_ar": "بيكمين 4", "year": 2023, "genre": "استراتيجية/مغامرات"},
-        {"name": "Super Mario Bros. Wonder", "name_ar": "سوبر ماريو برذرز وندر", "year": 2023, "genre": "منصات"},
-        {"name": "The Legend of Zelda: Tears of the Kingdom", "name_ar": "زيلدا: دموع المملكة", "year": 2023, "genre": "مغامرات"},
-        {"name": "Assassin's Creed Mirage", "name_ar": "أساسنز كريد ميراج", "year": 2023, "genre": "أكشن/مغامرات"},
-        {"name": "Lords of the Fallen", "name_ar": "لوردز أوف ذا فولن", "year": 2023, "genre": "RPG/أكشن"},
-        {"name": "Cocoon", "name_ar": "كوكون", "year": 2023, "genre": "ألغاز/مغامرات"},
-        {"name": "Sea of Stars", "name_ar": "سي أوف ستارز", "year": 2023, "genre": "RPG"},
-        {"name": "Splatoon 3", "name_ar": "سبلاتون 3", "year": 2022, "genre": "TPS/متعدد"},
-        {"name": "Xenoblade Chronicles 3", "name_ar": "زينوبليد كرونيكلز 3", "year": 2022, "genre": "RPG"},
-        {"name": "Sifu", "name_ar": "سيفو", "year": 2022, "genre": "أكشن/قتال"},
-        {"name": "Cult of the Lamb", "name_ar": "كلت أوف ذا لامب", "year": 2022, "genre": "روجلايك/محاكاة"},
-        {"name": "Stray", "name_ar": "ستراي", "year": 2022, "genre": "مغامرات"},
-        {"name": "Neon White", "name_ar": "نيون وايت", "year": 2022, "genre": "أكشن/FPS"},
-        {"name": "Vampire Survivors", "name_ar": "فامباير سيرفايفرز", "year": 2022, "genre": "روجلايك"},
-        {"name": "Pokemon Scarlet and Violet", "name_ar": "بوكيمون سكارليت وفايولت", "year": 2022, "genre": "RPG"},
-        {"name": "A Plague Tale: Requiem", "name_ar": "قصة طاعون: ريكويم", "year": 2022, "genre": "مغامرات"},
-        {"name": "God of War Ragnarök", "name_ar": "إله الحرب راجناروك", "year": 2022, "genre": "أكشن/مغامرات"},
-        {"name": "Call of Duty: Modern Warfare II", "name_ar": "كول أوف ديوتي: مودرن وورفير 2", "year": 2022, "genre": "FPS"},
-        {"name": "Gran Turismo 7", "name_ar": "جران توريزمو 7", "year": 2022, "genre": "سباق"},
-        {"name": "PUBG: BATTLEGROUNDS", "name_ar": "ببجي", "year": 2017, "genre": "باتل رويال"},
-        {"name": "Dota 2", "name_ar": "دوتا 2", "year": 2013, "genre": "MOBA"},
-        {"name": "Counter-Strike 2", "name_ar": "كاونتر سترايك 2", "year": 2023, "genre": "FPS"},
-        {"name": "World of Warcraft", "name_ar": "وورلد أوف ووركرافت", "year": 2004, "genre": "MMORPG"},
-        {"name": "Path of Exile", "name_ar": "باث أوف إكزايل", "year": 2013, "genre": "RPG/أكشن"},
-        {"name": "Escape from Tarkov", "name_ar": "إسكيب فروم تاركوف", "year": 2017, "genre": "FPS/بقاء"},
-        {"name": "Rust", "name_ar": "رست", "year": 2018, "genre": "بقاء/متعدد"},
-        {"name": "ARK: Survival Evolved", "name_ar": "آرك: سيرفايفل إيفولفد", "year": 2017, "genre": "بقاء/مغامرات"},
-        {"name": "The Forest", "name_ar": "ذا فورست", "year": 2018, "genre": "بقاء/رعب"},
-        {"name": "Sons of the Forest", "name_ar": "أبناء الغابة", "year": 2023, "genre": "بقاء/رعب"},
-        {"name": "Phasmophobia", "name_ar": "فازموفوبيا", "year": 2020, "genre": "رعب/تعاوني"},
-        {"name": "Dead by Daylight", "name_ar": "ديد باي دايلايت", "year": 2016, "genre": "رعب/متعدد"},
-        {"name": "Fall Guys", "name_ar": "فول جايز", "year": 2020, "genre": "حفلة/باتل رويال"},
-        {"name": "Stumble Guys", "name_ar": "ستمبل جايز", "year": 2021, "genre": "حفلة/باتل رويال"},
-    ],
-    "movies": [
-        {"name": "The Shawshank Redemption", "name_ar": "الخلاص من شاوشانك", "year": 1994, "genre": "دراما"},
-        {"name": "The Godfather", "name_ar": "العراب", "year": 1972, "genre": "جريمة/دراما"},
-        {"name": "The Dark Knight", "name_ar": "فارس الظلام", "year": 2008, "genre": "أكشن/جريمة"},
-        {"name": "Pulp Fiction", "name_ar": "خيال رخيص", "year": 1994, "genre": "جريمة/دراما"},
-        {"name": "Fight Club", "name_ar": "نادي القتال", "year": 1999, "genre": "دراما"},
-        {"name": "Inception", "name_ar": "استهلال", "year": 2010, "genre": "خيال علمي/أكشن"},
-        {"name": "The Matrix", "name_ar": "ذا ماتريكس", "year": 1999, "genre": "خيال علمي/أكشن"},
-        {"name": "Interstellar", "name_ar": "بين النجوم", "year": 2014, "genre": "خيال علمي/دراما"},
-        {"name": "Forrest Gump", "name_ar": "فورست جامب", "year": 1994, "genre": "دراما/رومانسي"},
-        {"name": "The Lord of the Rings: The Fellowship of the Ring", "name_ar": "سيد الخواتم: رفقة الخاتم", "year": 2001, "genre": "فانتازيا/مغامرات"},
-        {"name": "The Lord of the Rings: The Two Towers", "name_ar": "سيد الخواتم: البرجان", "year": 2002, "genre": "فانتازيا/مغامرات"},
-        {"name": "The Lord of the Rings: Return of the King", "name_ar": "سيد الخواتم: عودة الملك", "year": 2003, "genre": "فانتازيا/مغامرات"},
-        {"name": "Star Wars: A New Hope", "name_ar": "حرب النجوم: أمل جديد", "year": 1977, "genre": "خيال علمي/مغامرات"},
-        {"name": "Star Wars: The Empire Strikes Back", "name_ar": "حرب النجوم: الإمبراطورية ترد", "year": 1980, "genre": "خيال علمي/مغامرات"},
-        {"name": "Gladiator", "name_ar": "المصارع", "year": 2000, "genre": "أكشن/دراما"},
-        {"name": "The Prestige", "name_ar": "الهيبة", "year": 2006, "genre": "غموض/دراما"},
-        {"name": "Memento", "name_ar": "تذكار", "year": 2000, "genre": "غموض/إثارة"},
-        {"name": "Se7en", "name_ar": "سبعة", "year": 1995, "genre": "جريمة/غموض"},
-        {"name": "The Silence of the Lambs", "name_ar": "صمت الحملان", "year": 1991, "genre": "إثارة/جريمة"},
-        {"name": "Schindler's List", "name_ar": "قائمة شندلر", "year": 1993, "genre": "تاريخي/دراما"},
-        {"name": "Saving Private Ryan", "name_ar": "إنقاذ الجندي رايان", "year": 1998, "genre": "حرب/دراما"},
-        {"name": "The Green Mile", "name_ar": "الميل الأخضر", "year": 1999, "genre": "دراما/فانتازيا"},
-        {"name": "Goodfellas", "name_ar": "رفاق طيبون", "year": 1990, "genre": "جريمة/دراما"},
-        {"name": "The Departed", "name_ar": "المغادرون", "year": 2006, "genre": "جريمة/إثارة"},
-        {"name": "Django Unchained", "name_ar": "جانغو طليقًا", "year": 2012, "genre": "ويسترن/دراما"},
-        {"name": "Inglourious Basterds", "name_ar": "أوغاد مجهولون", "year": 2009, "genre": "حرب/دراما"},
-        {"name": "The Wolf of Wall Street", "name_ar": "ذئب وول ستريت", "year": 2013, "genre": "سيرة/كوميديا"},
-        {"name": "Joker", "name_ar": "الجوكر", "year": 2019, "genre": "جريمة/دراما"},
-        {"name": "Parasite", "name_ar": "طفيلي", "year": 2019, "genre": "إثارة/دراما"},
-        {"name": "Whiplash", "name_ar": "ويبلاش", "year": 2014, "genre": "دراما/موسيقى"},
-        {"name": "The Social Network", "name_ar": "الشبكة الاجتماعية", "year": 2010, "genre": "دراما/سيرة"},
-        {"name": "Shutter Island", "name_ar": "جزيرة شاتر", "year": 2010, "genre": "غموض/إثارة"},
-        {"name": "Gone Girl", "name_ar": "الفتاة المفقودة", "year": 2014, "genre": "غموض/إثارة"},
-        {"name": "The Revenant", "name_ar": "العائد", "year": 2015, "genre": "مغامرات/دراما"},
-        {"name": "Mad Max: Fury Road", "name_ar": "ماد ماكس: طريق الغضب", "year": 2015, "genre": "أكشن/مغامرات"},
-        {"name": "John Wick", "name_ar": "جون ويك", "year": 2014, "genre": "أكشن/إثارة"},
-        {"name": "John Wick: Chapter 4", "name_ar": "جون ويك: الفصل 4", "year": 2023, "genre": "أكشن/إثارة"},
-        {"name": "Avengers: Endgame", "name_ar": "أفنجرز: نهاية اللعبة", "year": 2019, "genre": "أكشن/خيال علمي"},
-        {"name": "Avengers: Infinity War", "name_ar": "أفنجرز: حرب اللانهاية", "year": 2018, "genre": "أكشن/خيال علمي"},
-        {"name": "Spider-Man: No Way Home", "name_ar": "سبايدرمان: لا طريق للوطن", "year": 2021, "genre": "أكشن/مغامرات"},
-        {"name": "Black Panther", "name_ar": "النمر الأسود", "year": 2018, "genre": "أكشن/خيال علمي"},
-        {"name": "Guardians of the Galaxy", "name_ar": "حراس المجرة", "year": 2014, "genre": "أكشن/كوميدي"},
-        {"name": "Iron Man", "name_ar": "الرجل الحديدي", "year": 2008, "genre": "أكشن/خيال علمي"},
-        {"name": "Thor: Ragnarok", "name_ar": "ثور: راجناروك", "year": 2017, "genre": "أكشن/كوميدي"},
-        {"name": "Captain America: The Winter Soldier", "name_ar": "كابتن أمريكا: جندي الشتاء", "year": 2014, "genre": "أكشن/خيال علمي"},
-        {"name": "The Batman", "name_ar": "باتمان", "year": 2022, "genre": "أكشن/جريمة"},
-        {"name": "Dune", "name_ar": "كثيب", "year": 2021, "genre": "خيال علمي/مغامرات"},
-        {"name": "Dune: Part Two", "name_ar": "كثيب: الجزء الثاني", "year": 2024, "genre": "خيال علمي/مغامرات"},
-        {"name": "Oppenheimer", "name_ar": "أوبنهايمر", "year": 2023, "genre": "سيرة/تاريخي"},
-        {"name": "Barbie", "name_ar": "باربي", "year": 2023, "genre": "كوميدي/فانتازيا"},
-        {"name": "Everything Everywhere All at Once", "name_ar": "كل شيء في كل مكان دفعة واحدة", "year": 2022, "genre": "خيال علمي/كوميدي"},
-        {"name": "Top Gun: Maverick", "name_ar": "توب غان: مافريك", "year": 2022, "genre": "أكشن/دراما"},
-        {"name": "The Northman", "name_ar": "الشمالي", "year": 2022, "genre": "أكشن/مغامرات"},
-        {"name": "Avatar: The Way of Water", "name_ar": "أفاتار: طريق الماء", "year": 2022, "genre": "خيال علمي/مغامرات"},
-        {"name": "Avatar", "name_ar": "أفاتار", "year": 2009, "genre": "خيال علمي/مغامرات"},
-        {"name": "Titanic", "name_ar": "تايتانيك", "year": 1997, "genre": "رومانسي/دراما"},
-        {"name": "The Lion King", "name_ar": "الأسد الملك", "year": 1994, "genre": "رسوم متحركة/مغامرات"},
-        {"name": "Spirited Away", "name_ar": "المخطوفة", "year": 2001, "genre": "رسوم متحركة/فانتازيا"},
-        {"name": "Your Name", "name_ar": "اسمك", "year": 2016, "genre": "رسوم متحركة/رومانسي"},
-        {"name": "Demon Slayer: Mugen Train", "name_ar": "قاتل الشياطين: قطار موغين", "year": 2020, "genre": "رسوم متحركة/أكشن"},
-        {"name": "A Silent Voice", "name_ar": "صوت صامت", "year": 2016, "genre": "رسوم متحركة/دراما"},
-        {"name": "Princess Mononoke", "name_ar": "الأميرة مونونوكي", "year": 1997, "genre": "رسوم متحركة/فانتازيا"},
-        {"name": "Howl's Moving Castle", "name_ar": "قلعة هاول المتحركة", "year": 2004, "genre": "رسوم متحركة/فانتازيا"},
-        {"name": "Akira", "name_ar": "أكيرا", "year": 1988, "genre": "رسوم متحركة/خيال علمي"},
-        {"name": "Ghost in the Shell", "name_ar": "الشبح في الصدفة", "year": 1995, "genre": "رسوم متحركة/خيال علمي"},
-        {"name": "Blade Runner 2049", "name_ar": "بليد رنر 2049", "year": 2017, "genre": "خيال علمي/إثارة"},
-        {"name": "Arrival", "name_ar": "الوصول", "year": 2016, "genre": "خيال علمي/دراما"},
-        {"name": "Ex Machina", "name_ar": "إكس ماكينا", "year": 2014, "genre": "خيال علمي/إثارة"},
-        {"name": "Her", "name_ar": "هي", "year": 2013, "genre": "خيال علمي/رومانسي"},
-        {"name": "Gravity", "name_ar": "جاذبية", "year": 2013, "genre": "خيال علمي/إثارة"},
-        {"name": "The Martian", "name_ar": "المريخي", "year": 2015, "genre": "خيال علمي/مغامرات"},
-        {"name": "Edge of Tomorrow", "name_ar": "حافة الغد", "year": 2014, "genre": "خيال علمي/أكشن"},
-        {"name": "Get Out", "name_ar": "اخرج", "year": 2017, "genre": "رعب/إثارة"},
-        {"name": "Us", "name_ar": "نحن", "year": 2019, "genre": "رعب/إثارة"},
-        {"name": "A Quiet Place", "name_ar": "مكان هادئ", "year": 2018, "genre": "رعب/إثارة"},
-        {"name": "Hereditary", "name_ar": "وراثي", "year": 2018, "genre": "رعب/دراما"},
-        {"name": "Midsommar", "name_ar": "منتصف الصيف", "year": 2019, "genre": "رعب/دراما"},
-        {"name": "The Conjuring", "name_ar": "الشعوذة", "year": 2013, "genre": "رعب"},
-        {"name": "It", "name_ar": "إنه", "year": 2017, "genre": "رعب"},
-        {"name": "The Exorcist", "name_ar": "طارد الأرواح", "year": 1973, "genre": "رعب"},
-        {"name": "The Shining", "name_ar": "البريق", "year": 1980, "genre": "رعب"},
-        {"name": "Psycho", "name_ar": "سايكو", "year": 1960, "genre": "رعب/إثارة"},
-        {"name": "The Grand Budapest Hotel", "name_ar": "فندق بودابست الكبير", "year": 2014, "genre": "كوميدي/دراما"},
-        {"name": "The Royal Tenenbaums", "name_ar": "عائلة تينينباوم الملكية", "year": 2001, "genre": "كوميدي/دراما"},
-        {"name": "Moonrise Kingdom", "name_ar": "مملكة ضوء القمر", "year": 2012, "genre": "كوميدي/رومانسي"},
-        {"name": "La La Land", "name_ar": "لا لا لاند", "year": 2016, "genre": "موسيقي/رومانسي"},
-        {"name": "1917", "name_ar": "1917", "year": 2019, "genre": "حرب/دراما"},
-        {"name": "Dunkirk", "name_ar": "دنكيرك", "year": 2017, "genre": "حرب/أكشن"},
-        {"name": "Hacksaw Ridge", "name_ar": "نتوء منشار", "year": 2016, "genre": "حرب/دراما"},
-        {"name": "No Country for Old Men", "name_ar": "لا بلد للعجائز", "year": 2007, "genre": "جريمة/إثارة"},
-        {"name": "There Will Be Blood", "name_ar": "سيكون هناك دم", "year": 2007, "genre": "دراما"},
-        {"name": "12 Years a Slave", "name_ar": "12 سنة عبداً", "year": 2013, "genre": "تاريخي/دراما"},
-        {"name": "The Truman Show", "name_ar": "عرض ترومان", "year": 1998, "genre": "كوميدي/دراما"},
-        {"name": "Eternal Sunshine of the Spotless Mind", "name_ar": "إشراقة أبدية لعقل نظيف", "year": 2004, "genre": "رومانسي/خيال علمي"},
-        {"name": "Oldboy", "name_ar": "أولدبوي", "year": 2003, "genre": "أكشن/إثارة"},
-        {"name": "The Handmaiden", "name_ar": "الخادمة", "year": 2016, "genre": "إثارة/رومانسي"},
-        {"name": "Train to Busan", "name_ar": "قطار إلى بوسان", "year": 2016, "genre": "أكشن/رعب"},
-        {"name": "Memories of Murder", "name_ar": "ذكريات جريمة", "year": 2003, "genre": "جريمة/دراما"},
-        {"name": "Killers of the Flower Moon", "name_ar": "قتلة قمر الزهرة", "year": 2023, "genre": "جريمة/دراما"},
-        {"name": "Poor Things", "name_ar": "أشياء مسكينة", "year": 2023, "genre": "كوميدي/دراما"},
-        {"name": "The Holdovers", "name_ar": "المتبقون", "year": 2023, "genre": "كوميدي/دراما"},
-    ],
-    "series": [
-        {"name": "Breaking Bad", "name_ar": "بريكنج باد", "year": 2008, "genre": "جريمة/دراما"},
-        {"name": "Game of Thrones", "name_ar": "صراع العروش", "year": 2011, "genre": "فانتازيا/دراما"},
-        {"name": "The Wire", "name_ar": "السلك", "year": 2002, "genre": "جريمة/دراما"},
-        {"name": "The Sopranos", "name_ar": "عائلة سوبرانو", "year": 1999, "genre": "جريمة/دراما"},
-        {"name": "Friends", "name_ar": "فريندز", "year": 1994, "genre": "كوميدي"},
-        {"name": "The Office", "name_ar": "المكتب", "year": 2005, "genre": "كوميدي"},
-        {"name": "Stranger Things", "name_ar": "أشياء غريبة", "year": 2016, "genre": "خيال علمي/رعب"},
-        {"name": "The Crown", "name_ar": "التاج", "year": 2016, "genre": "تاريخي/دراما"},
-        {"name": "Chernobyl", "name_ar": "تشيرنوبل", "year": 2019, "genre": "تاريخي/دراما"},
-        {"name": "True Detective", "name_ar": "المحقق الحقيقي", "year": 2014, "genre": "جريمة/دراما"},
-        {"name": "Sherlock", "name_ar": "شيرلوك", "year": 2010, "genre": "جريمة/دراما"},
-        {"name": "Black Mirror", "name_ar": "المرآة السوداء", "year": 2011, "genre": "خيال علمي/إثارة"},
-        {"name": "Money Heist", "name_ar": "البروفيسور", "year": 2017, "genre": "جريمة/أكشن"},
-        {"name": "Narcos", "name_ar": "ناركوس", "year": 2015, "genre": "جريمة/دراما"},
-        {"name": "Peaky Blinders", "name_ar": "بيكي بلايندرز", "year": 2013, "genre": "جريمة/دراما"},
-        {"name": "The Mandalorian", "name_ar": "الماندالوريان", "year": 2019, "genre": "خيال علمي/أكشن"},
-        {"name": "The Witcher", "name_ar": "الساحر", "year": 2019, "genre": "فانتازيا/أكشن"},
-        {"name": "Squid Game", "name_ar": "لعبة الحبار", "year": 2021, "genre": "إثارة/دراما"},
-        {"name": "Succession", "name_ar": "الخلافة", "year": 2018, "genre": "دراما"},
-        {"name": "House of the Dragon", "name_ar": "بيت التنين", "year": 2022, "genre": "فانتازيا/دراما"},
-        {"name": "The Last of Us", "name_ar": "ذا لاست أوف أس", "year": 2023, "genre": "دراما/أكشن"},
-        {"name": "The Boys", "name_ar": "ذا بويز", "year": 2019, "genre": "أكشن/كوميدي"},
-        {"name": "Arcane", "name_ar": "أركين", "year": 2021, "genre": "رسوم متحركة/أكشن"},
-        {"name": "Attack on Titan", "name_ar": "هجوم العمالقة", "year": 2013, "genre": "أنمي/أكشن"},
-        {"name": "Death Note", "name_ar": "مذكرة الموت", "year": 2006, "genre": "أنمي/إثارة"},
-        {"name": "Fullmetal Alchemist: Brotherhood", "name_ar": "الخيميائي المعدني", "year": 2009, "genre": "أنمي/أكشن"},
-        {"name": "One Piece", "name_ar": "ون بيس", "year": 1999, "genre": "أنمي/مغامرات"},
-        {"name": "Naruto Shippuden", "name_ar": "ناروتو شيبودن", "year": 2007, "genre": "أنمي/أكشن"},
-        {"name": "Demon Slayer", "name_ar": "قاتل الشياطين", "year": 2019, "genre": "أنمي/أكشن"},
-        {"name": "Jujutsu Kaisen", "name_ar": "جوجوتسو كايسن", "year": 2020, "genre": "أنمي/أكشن"},
-        {"name": "Hunter x Hunter", "name_ar": "القناص", "year": 2011, "genre": "أنمي/مغامرات"},
-        {"name": "My Hero Academia", "name_ar": "أكاديمية بطلي", "year": 2016, "genre": "أنمي/أكشن"},
-        {"name": "Steins;Gate", "name_ar": "ستاينز جيت", "year": 2011, "genre": "أنمي/خيال علمي"},
-        {"name": "Cowboy Bebop", "name_ar": "كاوبوي بيبوب", "year": 1998, "genre": "أنمي/خيال علمي"},
-        {"name": "Neon Genesis Evangelion", "name_ar": "نيون جينيسيس إيفانجيليون", "year": 1995, "genre": "أنمي/ميكا"},
-        {"name": "Vinland Saga", "name_ar": "فينلاند ساجا", "year": 2019, "genre": "أنمي/أكشن"},
-        {"name": "Spy x Family", "name_ar": "سباي × فاميلي", "year": 2022, "genre": "أنمي/كوميدي"},
-        {"name": "Chainsaw Man", "name_ar": "رجل المنشار", "year": 2022, "genre": "أنمي/أكشن"},
-        {"name": "The Walking Dead", "name_ar": "الموتى السائرون", "year": 2010, "genre": "رعب/دراما"},
-        {"name": "Better Call Saul", "name_ar": "اتصل بسول", "year": 2015, "genre": "جريمة/دراما"},
-        {"name": "Ozark", "name_ar": "أوزارك", "year": 2017, "genre": "جريمة/دراما"},
-        {"name": "Mindhunter", "name_ar": "صائد العقول", "year": 2017, "genre": "جريمة/إثارة"},
-        {"name": "Fargo", "name_ar": "فارجو", "year": 2014, "genre": "جريمة/دراما"},
-        {"name": "Mr. Robot", "name_ar": "مستر روبوت", "year": 2015, "genre": "إثارة/دراما"},
-        {"name": "Westworld", "name_ar": "عالم الغرب", "year": 2016, "genre": "خيال علمي/ويسترن"},
-        {"name": "Dark", "name_ar": "دارك", "year": 2017, "genre": "خيال علمي/إثارة"},
-        {"name": "The Haunting of Hill House", "name_ar": "منزل التل المسكون", "year": 2018, "genre": "رعب/دراما"},
-        {"name": "Wednesday", "name_ar": "ويدنزداي", "year": 2022, "genre": "كوميدي/غموض"},
-        {"name": "The Umbrella Academy", "name_ar": "أكاديمية المظلة", "year": 2019, "genre": "أكشن/خيال علمي"},
-        {"name": "Loki", "name_ar": "لوكي", "year": 2021, "genre": "أكشن/خيال علمي"},
-        {"name": "WandaVision", "name_ar": "واندا فيجن", "year": 2021, "genre": "أكشن/كوميدي"},
-        {"name": "Andor", "name_ar": "أندور", "year": 2022, "genre": "خيال علمي/أكشن"},
-        {"name": "The Bear", "name_ar": "الدب", "year": 2022, "genre": "دراما/كوميدي"},
-        {"name": "Severance", "name_ar": "سيفرنس", "year": 2022, "genre": "خيال علمي/إثارة"},
-        {"name": "Yellowstone", "name_ar": "يلوستون", "year": 2018, "genre": "ويسترن/دراما"},
-        {"name": "Ted Lasso", "name_ar": "تيد لاسو", "year": 2020, "genre": "كوميدي/دراما"},
-        {"name": "The White Lotus", "name_ar": "اللوتس الأبيض", "year": 2021, "genre": "دراما/كوميدي"},
-        {"name": "Euphoria", "name_ar": "يوفوريا", "year": 2019, "genre": "دراما"},
-        {"name": "Fleabag", "name_ar": "فليباج", "year": 2016, "genre": "كوميدي/دراما"},
-        {"name": "Atlanta", "name_ar": "أتلانتا", "year": 2016, "genre": "كوميدي/دراما"},
-        {"name": "Barry", "name_ar": "باري", "year": 2018, "genre": "كوميدي/جريمة"},
-        {"name": "What We Do in the Shadows", "name_ar": "ما نفعله في الظل", "year": 2019, "genre": "كوميدي/رعب"},
-        {"name": "Only Murders in the Building", "name_ar": "جرائم في المبنى فقط", "year": 2021, "genre": "كوميدي/غموض"},
-        {"name": "Invincible", "name_ar": "لا يُقهر", "year": 2021, "genre": "رسوم متحركة/أكشن"},
-        {"name": "The Wheel of Time", "name_ar": "عجلة الزمن", "year": 2021, "genre": "فانتازيا"},
-        {"name": "Foundation", "name_ar": "الأساس", "year": 2021, "genre": "خيال علمي"},
-        {"name": "Rings of Power", "name_ar": "حلقات القوة", "year": 2022, "genre": "فانتازيا"},
-        {"name": "House of Cards", "name_ar": "بيت من ورق", "year": 2013, "genre": "دراما سياسية"},
-        {"name": "Homeland", "name_ar": "الوطن", "year": 2011, "genre": "إثارة/دراما"},
-        {"name": "24", "name_ar": "24", "year": 2001, "genre": "أكشن/إثارة"},
-        {"name": "Lost", "name_ar": "لوست", "year": 2004, "genre": "مغامرات/دراما"},
-        {"name": "Prison Break", "name_ar": "الهروب من السجن", "year": 2005, "genre": "أكشن/إثارة"},
-        {"name": "Vikings", "name_ar": "الفايكنج", "year": 2013, "genre": "أكشن/تاريخي"},
-        {"name": "The 100", "name_ar": "المائة", "year": 2014, "genre": "خيال علمي/دراما"},
-        {"name": "Lucifer", "name_ar": "لوسيفر", "year": 2016, "genre": "فانتازيا/جريمة"},
-        {"name": "The Good Place", "name_ar": "المكان الجيد", "year": 2016, "genre": "كوميدي/فانتازيا"},
-        {"name": "Brooklyn Nine-Nine", "name_ar": "بروكلين ناين ناين", "year": 2013, "genre": "كوميدي"},
-        {"name": "Parks and Recreation", "name_ar": "حدائق وترفيه", "year": 2009, "genre": "كوميدي"},
-        {"name": "Community", "name_ar": "كومينيتي", "year": 2009, "genre": "كوميدي"},
-        {"name": "How I Met Your Mother", "name_ar": "كيف قابلت أمكم", "year": 2005, "genre": "كوميدي/رومانسي"},
-        {"name": "Seinfeld", "name_ar": "ساينفيلد", "year": 1989, "genre": "كوميدي"},
-        {"name": "The Big Bang Theory", "name_ar": "نظرية الانفجار العظيم", "year": 2007, "genre": "كوميدي"},
-        {"name": "Dexter", "name_ar": "ديكستر", "year": 2006, "genre": "جريمة/دراما"},
-        {"name": "The Blacklist", "name_ar": "القائمة السوداء", "year": 2013, "genre": "جريمة/إثارة"},
-        {"name": "Suits", "name_ar": "سوتس", "year": 2011, "genre": "دراما/قانوني"},
-        {"name": "Billions", "name_ar": "بيليونز", "year": 2016, "genre": "دراما"},
-        {"name": "The Morning Show", "name_ar": "برنامج الصباح", "year": 2019, "genre": "دراما"},
-        {"name": "Shogun", "name_ar": "شوغن", "year": 2024, "genre": "تاريخي/دراما"},
-        {"name": "Fallout", "name_ar": "فولاوت", "year": 2024, "genre": "خيال علمي/أكشن"},
-        {"name": "3 Body Problem", "name_ar": "مشكلة الأجسام الثلاثة", "year": 2024, "genre": "خيال علمي"},
-        {"name": "Baby Reindeer", "name_ar": "بيبي رينديير", "year": 2024, "genre": "دراما"},
-        {"name": "The Gentlemen", "name_ar": "السادة", "year": 2024, "genre": "كوميدي/جريمة"},
-        {"name": "Ripley", "name_ar": "ريبلي", "year": 2024, "genre": "إثارة/جريمة"},
-        {"name": "Hacks", "name_ar": "هاكس", "year": 2021, "genre": "كوميدي/دراما"},
-        {"name": "Slow Horses", "name_ar": "الخيول البطيئة", "year": 2022, "genre": "إثارة/تجسس"},
-        {"name": "The Penguin", "name_ar": "البطريق", "year": 2024, "genre": "جريمة/دراما"},
-        {"name": "Agatha All Along", "name_ar": "أجاثا طوال الوقت", "year": 2024, "genre": "فانتازيا/كوميدي"},
-    ],
-    "youtube": [
-        {"name": "MrBeast", "name_ar": "مستر بيست - تحديات", "genre": "ترفيه/تحديات"},
-        {"name": "PewDiePie", "name_ar": "بيوديباي - ألعاب وكوميديا", "genre": "ألعاب/ترفيه"},
-        {"name": "Markiplier", "name_ar": "ماركيبلاير - ألعاب رعب", "genre": "ألعاب"},
-        {"name": "Jacksepticeye", "name_ar": "جاكسبتيكاي - ألعاب وكوميديا", "genre": "ألعاب"},
-        {"name": "Kurzgesagt", "name_ar": "كورزجيساجت - علوم مبسطة", "genre": "تعليمي"},
-        {"name": "Veritasium", "name_ar": "فيريتاسيوم - علوم وتجارب", "genre": "تعليمي"},
-        {"name": "Vsauce", "name_ar": "في سوس - أسئلة علمية غريبة", "genre": "تعليمي"},
-        {"name": "Dude Perfect", "name_ar": "ديود بيرفكت - رياضة وتحديات", "genre": "رياضة/ترفيه"},
-        {"name": "Linus Tech Tips", "name_ar": "لينوس تك تيبس - تقنية", "genre": "تقنية"},
-        {"name": "MKBHD", "name_ar": "MKBHD - مراجعات تقنية", "genre": "تقنية"},
-        {"name": "Casey Neistat", "name_ar": "كيسي نايستات - فلوجات", "genre": "فلوجات"},
-        {"name": "Corridor Crew", "name_ar": "كوريدور كرو - مؤثرات بصرية", "genre": "أفلام/تقنية"},
-        {"name": "JiDion", "name_ar": "جي ديون - كوميديا ومقالب", "genre": "كوميديا"},
-        {"name": "IShowSpeed", "name_ar": "آي شو سبيد - ترفيه مباشر", "genre": "ترفيه"},
-        {"name": "Kai Cenat", "name_ar": "كاي سينات - بث مباشر", "genre": "ترفيه"},
-        {"name": "Sidemen", "name_ar": "سايدمن - تحديات جماعية", "genre": "ترفيه"},
-        {"name": "Unbox Therapy", "name_ar": "أنبوكس ثيرابي - فتح صناديق", "genre": "تقنية"},
-        {"name": "Numberphile", "name_ar": "نمبرفايل - رياضيات", "genre": "تعليمي"},
-        {"name": "3Blue1Brown", "name_ar": "ثري بلو ون براون - رياضيات مرئية", "genre": "تعليمي"},
-        {"name": "Oversimplified", "name_ar": "أوفرسمبلفايد - تاريخ مبسط", "genre": "تعليمي/تاريخ"},
-        {"name": "History Matters", "name_ar": "هيستوري ماترز - تاريخ قصير", "genre": "تعليمي/تاريخ"},
-        {"name": "CGP Grey", "name_ar": "سي جي بي جراي - شروحات", "genre": "تعليمي"},
-        {"name": "SmarterEveryDay", "name_ar": "سمارتر إيفري داي - علوم", "genre": "تعليمي"},
-        {"name": "Mark Rober", "name_ar": "مارك روبر - هندسة وتجارب", "genre": "تعليمي/ترفيه"},
-        {"name": "The Slow Mo Guys", "name_ar": "ذا سلو مو جايز - حركة بطيئة", "genre": "ترفيه/علوم"},
-        {"name": "Vox", "name_ar": "فوكس - شروحات وتحليلات", "genre": "تعليمي/أخبار"},
-        {"name": "Johnny Harris", "name_ar": "جوني هاريس - جيوبوليتيك", "genre": "تعليمي"},
-        {"name": "Wendover Productions", "name_ar": "وندوفر - شروحات متنوعة", "genre": "تعليمي"},
-        {"name": "Half as Interesting", "name_ar": "هاف آز إنترستنج - حقائق قصيرة", "genre": "تعليمي"},
-        {"name": "Real Engineering", "name_ar": "ريل إنجنيرنج - هندسة", "genre": "تعليمي"},
-        {"name": "Tom Scott", "name_ar": "توم سكوت - أماكن ومعلومات", "genre": "تعليمي"},
-        {"name": "Fireship", "name_ar": "فايرشيب - برمجة سريعة", "genre": "برمجة"},
-        {"name": "NetworkChuck", "name_ar": "نتورك تشاك - شبكات وأمن", "genre": "تقنية"},
-        {"name": "The Coding Train", "name_ar": "ذا كودنج ترين - برمجة إبداعية", "genre": "برمجة"},
-        {"name": "Traversy Media", "name_ar": "ترافيرسي ميديا - تطوير ويب", "genre": "برمجة"},
-        {"name": "freeCodeCamp", "name_ar": "فري كود كامب - دورات مجانية", "genre": "برمجة"},
-        {"name": "GamesRadar", "name_ar": "جيمز رادار - أخبار ألعاب", "genre": "ألعاب"},
-        {"name": "IGN", "name_ar": "آي جي إن - مراجعات ألعاب", "genre": "ألعاب"},
-        {"name": "Gameranx", "name_ar": "جيمرانكس - أخبار ألعاب", "genre": "ألعاب"},
-        {"name": "theRadBrad", "name_ar": "ذا راد براد - قصص ألعاب", "genre": "ألعاب"},
-        {"name": "xQc", "name_ar": "إكس كيو سي - بث مباشر", "genre": "ترفيه"},
-        {"name": "Ludwig", "name_ar": "لودفيج - ترفيه متنوع", "genre": "ترفيه"},
-        {"name": "Jschlatt", "name_ar": "جيشلات - كوميديا", "genre": "كوميديا"},
-        {"name": "Dream", "name_ar": "دريم - ماينكرافت", "genre": "ألعاب"},
-        {"name": "GeorgeNotFound", "name_ar": "جورج نوت فاوند - ماينكرافت", "genre": "ألعاب"},
-        {"name": "Technoblade", "name_ar": "تكنوبليد - ماينكرافت", "genre": "ألعاب"},
-        {"name": "TommyInnit", "name_ar": "تومي إنيت - ماينكرافت", "genre": "ألعاب"},
-        {"name": "Philza", "name_ar": "فيلزا - ماينكرافت هاردكور", "genre": "ألعاب"},
-        {"name": "2kliksphilip", "name_ar": "تو كليكس فيليب - كاونتر سترايك", "genre": "ألعاب"},
-        {"name": "penguinz0", "name_ar": "بينجوينز زيرو - مراجعات وكوميديا", "genre": "ترفيه"},
-        {"name": "Dunkey", "name_ar": "دانكي - مراجعات ألعاب ساخرة", "genre": "ألعاب/كوميديا"},
-        {"name": "Game Theory", "name_ar": "جيم ثيوري - نظريات ألعاب", "genre": "ألعاب/تعليمي"},
-        {"name": "Film Theory", "name_ar": "فيلم ثيوري - نظريات أفلام", "genre": "أفلام/تعليمي"},
-        {"name": "CinemaSins", "name_ar": "سينما سينز - أخطاء الأفلام", "genre": "أفلام"},
-        {"name": "CinemaWins", "name_ar": "سينما وينز - محاسن الأفلام", "genre": "أفلام"},
-        {"name": "Chris Stuckmann", "name_ar": "كريس ستكمان - مراجعات أفلام", "genre": "أفلام"},
-        {"name": "Jeremy Jahns", "name_ar": "جيرمي جانز - مراجعات أفلام", "genre": "أفلام"},
-        {"name": "Red Letter Media", "name_ar": "ريد ليتر ميديا - نقد أفلام", "genre": "أفلام"},
-        {"name": "Corridor Digital", "name_ar": "كوريدور ديجيتال - أفلام قصيرة", "genre": "أفلام"},
-        {"name": "Gigguk", "name_ar": "جيجوك - أنمي", "genre": "أنمي"},
-        {"name": "Trash Taste", "name_ar": "تراش تيست - بودكاست", "genre": "بودكاست/أنمي"},
-        {"name": "CDawgVA", "name_ar": "سي داوج - أنمي وتحديات", "genre": "ترفيه/أنمي"},
-        {"name": "The Anime Man", "name_ar": "ذا أنمي مان - أنمي", "genre": "أنمي"},
-        {"name": "Nux Taku", "name_ar": "نوكس تاكو - أنمي وميمز", "genre": "أنمي"},
-        {"name": "NileRed", "name_ar": "نايل ريد - كيمياء", "genre": "تعليمي/علوم"},
-        {"name": "ElectroBOOM", "name_ar": "إلكتروبوم - كهرباء وكوميديا", "genre": "تعليمي"},
-        {"name": "Stuff Made Here", "name_ar": "ستف ميد هير - اختراعات", "genre": "هندسة"},
-        {"name": "Michael Reeves", "name_ar": "مايكل ريفز - روبوتات مجنونة", "genre": "تقنية/كوميديا"},
-        {"name": "William Osman", "name_ar": "ويليام عثمان - اختراعات فاشلة", "genre": "ترفيه/هندسة"},
-        {"name": "Adam Savage's Tested", "name_ar": "آدم سافيج - صناعة وتجارب", "genre": "صناعة"},
-        {"name": "Colin Furze", "name_ar": "كولين فيرز - اختراعات خطرة", "genre": "هندسة"},
-        {"name": "Simone Giertz", "name_ar": "سيموني جيرتز - روبوتات فاشلة", "genre": "هندسة/كوميديا"},
-        {"name": "I Did A Thing", "name_ar": "آي ديد أ ثينج - اختراعات غريبة", "genre": "ترفيه"},
-        {"name": "JJ Olatunji", "name_ar": "كيه إس آي - ترفيه", "genre": "ترفيه"},
-        {"name": "MrWhoseTheBoss", "name_ar": "مستر هوز ذا بوس - تقنية", "genre": "تقنية"},
-        {"name": "Austin Evans", "name_ar": "أوستن إيفانز - تقنية", "genre": "تقنية"},
-        {"name": "Dave2D", "name_ar": "ديف تو دي - مراجعات لابتوب", "genre": "تقنية"},
-        {"name": "iJustine", "name_ar": "آي جستين - تقنية آبل", "genre": "تقنية"},
-        {"name": "TechLinked", "name_ar": "تك لينكد - أخبار تقنية", "genre": "تقنية"},
-        {"name": "JerryRigEverything", "name_ar": "جيري ريج - تفكيك أجهزة", "genre": "تقنية"},
-        {"name": "Zack Nelson", "name_ar": "زاك نيلسون - اختبارات تحمل", "genre": "تقنية"},
-        {"name": "Joshua Weissman", "name_ar": "جوشوا وايزمان - طبخ", "genre": "طبخ"},
-        {"name": "Binging with Babish", "name_ar": "طبخ مع بابيش", "genre": "طبخ"},
-        {"name": "Gordon Ramsay", "name_ar": "جوردن رامزي - طبخ", "genre": "طبخ"},
-        {"name": "Nick DiGiovanni", "name_ar": "نيك ديجوفاني - طبخ", "genre": "طبخ"},
-        {"name": "First We Feast", "name_ar": "فيرست وي فيست - هوت وينجز", "genre": "ترفيه/طعام"},
-        {"name": "Sorted Food", "name_ar": "سورتد فود - طبخ جماعي", "genre": "طبخ"},
-        {"name": "Tasty", "name_ar": "تيستي - وصفات سريعة", "genre": "طبخ"},
-        {"name": "Yes Theory", "name_ar": "يس ثيوري - مغامرات", "genre": "مغامرات"},
-        {"name": "Sailing La Vagabonde", "name_ar": "سايلنج لا فاجابوند - إبحار", "genre": "سفر"},
-        {"name": "Drew Binsky", "name_ar": "درو بينسكي - سفر", "genre": "سفر"},
-        {"name": "Kara and Nate", "name_ar": "كارا وناتي - سفر", "genre": "سفر"},
-        {"name": "Peter McKinnon", "name_ar": "بيتر ماكينون - تصوير", "genre": "تصوير"},
-        {"name": "Mango Street", "name_ar": "مانجو ستريت - تصوير", "genre": "تصوير"},
-        {"name": "Brandon Woelfel", "name_ar": "براندون ويلفل - تصوير", "genre": "تصوير"},
-        {"name": "Daniel Schiffer", "name_ar": "دانيال شيفر - تصوير إعلانات", "genre": "تصوير"},
-        {"name": "Parker Walbeck", "name_ar": "باركر والبيك - فيديو", "genre": "تصوير"},
-        {"name": "Matt D'Avella", "name_ar": "مات دافيلا - مينيماليزم", "genre": "أسلوب حياة"},
-        {"name": "Nathaniel Drew", "name_ar": "ناثانيال درو - أسلوب حياة", "genre": "أسلوب حياة"},
-        {"name": "Thomas Frank", "name_ar": "توماس فرانك - إنتاجية", "genre": "تعليمي"},
-        {"name": "Ali Abdaal", "name_ar": "علي عبدال - إنتاجية", "genre": "تعليمي"},
-    ]
+# Arabic letters that are written interchangeably; tatweel is dropped
+ARABIC_FOLDING = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ـ": None,
+})
+
+def normalize_text(text: str) -> str:
+    """Case- and accent-insensitive form of a name used for matching.
+
+    Arabic alef variants, taa marbuta and alef maqsura are folded, and
+    diacritics and tatweel are removed.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold().translate(ARABIC_FOLDING))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split())
+
+def sorted_member(ordinals: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Mask of the values that occur in the sorted ordinals, by binary search"""
+    if not len(ordinals):
+        return np.zeros(len(values), dtype=bool)
+    found = np.searchsorted(ordinals, values)
+    return ordinals[np.minimum(found, len(ordinals) - 1)] == values
+
+def search_tokens(text: str) -> List[str]:
+    return re.findall(r"\w+", normalize_text(text))
+
+def tokenize_genre(genre: Optional[str]) -> List[str]:
+    """Split compound genres such as "RPG/أكشن" into their parts"""
+    if not genre:
+        return []
+    return [token.strip() for token in genre.split("/") if token.strip()]
+
+def derive_fields(doc: dict) -> dict:
+    """Compute the fields read paths serve as-is, once at ingest time"""
+    doc["external_url"] = get_external_url(doc["name"], doc["category"])
+    doc["search_key"] = normalize_text(f"{doc['name']} {doc['name_ar']}")
+    doc["genre_tokens"] = tokenize_genre(doc.get("genre"))
+    return doc
+
+# Catalog data lives in a JSON Lines file: one metadata line, then one item per line
+CATALOG_FILE = Path(os.environ.get('CATALOG_FILE', ROOT_DIR / 'catalog.jsonl'))
+
+def read_catalog_metadata() -> dict:
+    with open(CATALOG_FILE, encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+def iter_catalog_items():
+    """Stream catalog items without holding the file in memory"""
+    with open(CATALOG_FILE, encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# Category id -> Arabic label, in display order
+CATEGORIES: Dict[str, str] = {
+    category["id"]: category["name_ar"] for category in read_catalog_metadata()["categories"]
 }
 
+# In-memory catalog index
+# "More like this" scoring: genre cosine similarity plus a bonus that halves
+# roughly every SIMILAR_YEAR_SCALE * ln 2 years apart
+SIMILAR_YEAR_WEIGHT = 0.3
+SIMILAR_YEAR_SCALE = 5.0
+
+# Materialized multi-genre pools kept per category
+POOL_CACHE_SIZE = 256
+
+# Weighted alias tables kept per category: each holds two floats per pool member
+ALIAS_CACHE_SIZE = 32
+
+# Search prefixes matching more postings than this get a precomputed ranked list
+SEARCH_PREFIX_INDEX_MIN = 512
+
+# Normalized genre tokens and whether items need "any" or "all" of them
+GenreFilter = Tuple[Tuple[str, ...], str]
+
+def parse_genre_filter(genre: str, mode: str = "any") -> GenreFilter:
+    """Parse ``RPG,أكشن`` into tokens; a compound genre like ``RPG/أكشن`` needs all of its parts"""
+    if mode not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="طريقة تصفية الأنواع غير صالحة")
+    tokens = tuple(sorted({token for part in genre.split(",") for token in tokenize_genre(part)}))
+    if "/" in genre and "," not in genre:
+        mode = "all"
+    return tokens, mode
+
+# Inclusive (first, last) year bounds; None leaves a side open
+YearRange = Tuple[Optional[int], Optional[int]]
+
+def parse_year_range(year_from: Optional[int], year_to: Optional[int], decade: Optional[int]) -> YearRange:
+    """Combine explicit bounds with a decade shortcut such as ``decade=1990``"""
+    if decade is not None:
+        decade -= decade % 10
+        year_from = decade if year_from is None else max(year_from, decade)
+        year_to = decade + 9 if year_to is None else min(year_to, decade + 9)
+    return year_from, year_to
+
+class OrdinalSlice(collections.abc.Sequence):
+    """Read-only window on a list of ordinals, created without copying"""
+    __slots__ = ("ordinals", "start", "stop")
+
+    def __init__(self, ordinals: List[int], start: int, stop: int):
+        self.ordinals = ordinals
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.stop - self.start:
+            raise IndexError(i)
+        return self.ordinals[self.start + i]
+
+def contains_sorted(ordinals: Sequence[int], ordinal: int) -> bool:
+    i = bisect.bisect_left(ordinals, ordinal)
+    return i < len(ordinals) and ordinals[i] == ordinal
+
+def ordinals_bitmap(ordinals: List[int]) -> int:
+    bitset = bytearray((max(ordinals, default=-1) >> 3) + 1)
+    for o in ordinals:
+        bitset[o >> 3] |= 1 << (o & 7)
+    return int.from_bytes(bitset, "little")
+
+def bitset_ordinals(bitset: bytes) -> List[int]:
+    """Ordinals of the set bits of a little-endian bitset"""
+    bits = np.unpackbits(np.frombuffer(bitset, dtype=np.uint8), bitorder="little")
+    return np.flatnonzero(bits).tolist()
+
+class AliasTable:
+    """Vose's alias method: O(n) to build, O(1) per weighted draw of a position"""
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: List[float]):
+        size = len(weights)
+        total = sum(weights)
+        self.prob = [1.0] * size
+        self.alias = list(range(size))
+        if not size or total <= 0:
+            return
+        scaled = [w * size / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def sample(self) -> int:
+        i = random.randrange(len(self.prob))
+        return i if random.random() < self.prob[i] else self.alias[i]
+
+def weighted_sample(candidates: List[int], weights: List[float], k: int) -> List[int]:
+    """k distinct candidates drawn without replacement in proportion to their weights"""
+    return heapq.nlargest(k, candidates, key=lambda o: random.random() ** (1.0 / max(weights[o], 1e-9)))
+
+class CategoryIndex:
+    """Read-only snapshot of one category, addressed by dense ordinals"""
+
+    def __init__(self, category: str, items: List[dict]):
+        self.category = category
+        # Ordinals are positions in id order, so they are stable for a given catalog
+        self.items = sorted(items, key=lambda item: item["id"])
+        self.ordinals = {item["id"]: i for i, item in enumerate(self.items)}
+        # Changes whenever the id set changes, invalidating old seen tokens
+        self.version = hashlib.blake2b(
+            "\n".join(self.ordinals).encode(), digest_size=4).digest()
+        # Compound genres such as "RPG/أكشن" are indexed under each of their tokens
+        self.genres: Dict[str, List[int]] = {}
+        for i, item in enumerate(self.items):
+            for token in item.get("genre_tokens") or tokenize_genre(item.get("genre")):
+                self.genres.setdefault(token, []).append(i)
+        self.genre_bitmaps = {token: ordinals_bitmap(ordinals) for token, ordinals in self.genres.items()}
+        self._pools: "OrderedDict[tuple, List[int]]" = OrderedDict()
+        # Ordinals of dated items sorted by year, with the matching years for bisect
+        self.year_order = sorted(
+            (i for i, item in enumerate(self.items) if item.get("year") is not None),
+            key=lambda i: self.items[i]["year"])
+        self.years_sorted = [self.items[i]["year"] for i in self.year_order]
+        self.year_order_array = np.array(self.year_order, dtype=np.int64)
+        # Per-item weights by weighting mode, and alias tables per (weighting, filter)
+        # built from them on demand
+        self.weights: Dict[str, List[float]] = {
+            "editorial": [float(item.get("weight") or 1.0) for item in self.items],
+            "popularity": [1.0] * len(self.items),
+        }
+        self._alias_tables: "OrderedDict[tuple, Tuple[Sequence[int], AliasTable]]" = OrderedDict()
+        self.genre_facets = [
+            {"genre": genre, "count": len(self.genres[genre])}
+            for genre in sorted(self.genres)
+        ]
+        # Inverted index from normalized name tokens (English and Arabic) to ordinals
+        postings: Dict[str, List[int]] = {}
+        for i, item in enumerate(self.items):
+            key = item.get("search_key") or f"{item['name']} {item['name_ar']}"
+            for token in dict.fromkeys(search_tokens(key)):
+                postings.setdefault(token, []).append(i)
+        self.postings = {token: np.array(ordinals, dtype=np.int64) for token, ordinals in postings.items()}
+        self.vocabulary = sorted(self.postings)
+        self.search_names = [(normalize_text(item["name"]), normalize_text(item["name_ar"])) for item in self.items]
+        self._build_prefix_index()
+        self._build_features()
+
+    def _build_prefix_index(self):
+        """Rank-ordered matches of every prefix with more than SEARCH_PREFIX_INDEX_MIN postings
+
+        A prefix with many matches is a prefix of few letters, so each length
+        only extends the prefixes that were heavy at the previous one.
+        """
+        by_length = sorted(range(len(self.items)), key=lambda o: (len(self.items[o]["name"]), self.items[o]["name"]))
+        self.rank_position = np.empty(len(self.items), dtype=np.int64)
+        self.rank_position[by_length] = np.arange(len(by_length))
+        # Normalized names in sorted order, so the names starting with a prefix form a range
+        starters = sorted((name, o) for o, names in enumerate(self.search_names) for name in set(names))
+        self.starter_names = [name for name, _ in starters]
+        self.starter_ordinals = np.array([o for _, o in starters], dtype=np.int64)
+
+        self.prefix_ranked: Dict[str, np.ndarray] = {}
+        self.prefix_sorted: Dict[str, np.ndarray] = {}
+        words, length = self.vocabulary, 1
+        while words:
+            groups: Dict[str, List[str]] = {}
+            for word in words:
+                if len(word) >= length:
+                    groups.setdefault(word[:length], []).append(word)
+            words = []
+            for prefix, group in groups.items():
+                if sum(len(self.postings[word]) for word in group) <= SEARCH_PREFIX_INDEX_MIN:
+                    continue
+                words.extend(group)
+                ordinals = np.unique(np.concatenate([self.postings[word] for word in group]))
+                self.prefix_sorted[prefix] = ordinals
+                self.prefix_ranked[prefix] = ordinals[np.argsort(self.rank_keys(ordinals, prefix), kind="stable")]
+            length += 1
+
+    def starting_with(self, prefix: str) -> np.ndarray:
+        """Ordinals with an English or Arabic normalized name starting with prefix"""
+        start = bisect.bisect_left(self.starter_names, prefix)
+        stop = bisect.bisect_left(self.starter_names, prefix + "\U0010ffff")
+        return self.starter_ordinals[start:stop]
+
+    def rank_keys(self, ordinals: np.ndarray, prefix: str) -> np.ndarray:
+        """Search rank of each ordinal: names starting with prefix first, then shorter names"""
+        starts = np.isin(ordinals, self.starting_with(prefix))
+        return self.rank_position[ordinals] + np.where(starts, 0, len(self.items))
+
+    def _build_features(self):
+        """Group items by genre token set for similarity, each group sorted by year.
+
+        Genre similarity only depends on the two token sets, so it is kept as
+        a small matrix between groups instead of a dense per-item matrix.
+        """
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, item in enumerate(self.items):
+            tokens = tuple(sorted(set(item.get("genre_tokens") or tokenize_genre(item.get("genre")))))
+            groups.setdefault(tokens, []).append(i)
+        signatures = list(groups)
+        self.signature_of = np.empty(len(self.items), dtype=np.int64)
+        self.signature_groups: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for s, signature in enumerate(signatures):
+            members = groups[signature]
+            self.signature_of[members] = s
+            dated = sorted((o for o in members if self.items[o].get("year")), key=lambda o: self.items[o]["year"])
+            self.signature_groups.append((
+                np.array([self.items[o]["year"] for o in dated], dtype=np.float64),
+                np.array(dated, dtype=np.int64),
+                np.array([o for o in members if not self.items[o].get("year")], dtype=np.int64),
+            ))
+        # Cosine similarity of binary token vectors: shared tokens / sqrt(|a| * |b|)
+        self.signature_similarity = np.array([
+            [len(set(a) & set(b)) / max(np.sqrt(len(a) * len(b)), 1.0) for b in signatures]
+            for a in signatures
+        ], dtype=np.float64).reshape(len(signatures), len(signatures))
+
+    def similar(self, ordinal: int, k: int) -> List[int]:
+        """Top-k ordinals by genre overlap, with nearby years breaking ties
+
+        Within a genre group only the k + 1 items nearest in year can win, so
+        each group contributes a small window found by binary search.
+        """
+        year = self.items[ordinal].get("year")
+        similarity = self.signature_similarity[self.signature_of[ordinal]]
+        scores, ordinals = [], []
+        for s, (years, dated, undated) in enumerate(self.signature_groups):
+            if not year:
+                window = slice(0, k + 1)
+                bonus = np.zeros(len(dated[window]))
+            else:
+                i = int(np.searchsorted(years, year))
+                window = slice(max(0, i - k - 1), i + k + 1)
+                bonus = SIMILAR_YEAR_WEIGHT * np.exp(-np.abs(years[window] - year) / SIMILAR_YEAR_SCALE)
+            scores += [similarity[s] + bonus, np.full(min(len(undated), k + 1), similarity[s])]
+            ordinals += [dated[window], undated[:k + 1]]
+        scores, ordinals = np.concatenate(scores), np.concatenate(ordinals)
+        scores[ordinals == ordinal] = -np.inf
+        k = min(k, len(self.items) - 1)
+        if k <= 0:
+            return []
+        top = np.argsort(-scores, kind="stable")[:k]
+        return ordinals[top].tolist()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def genre_bitset(self, genres: "GenreFilter") -> Optional[bytes]:
+        """Bitset of ordinals matching any or all of the genre tokens; None when unfiltered
+
+        Test membership with ``bits[o >> 3] >> (o & 7) & 1``: shifting the
+        combined int instead would copy all n bits for every ordinal tested.
+        """
+        tokens, mode = genres
+        if not tokens:
+            return None
+        bitmaps = [self.genre_bitmaps.get(token, 0) for token in tokens]
+        bitmap = functools.reduce(operator.and_ if mode == "all" else operator.or_, bitmaps)
+        return bitmap.to_bytes((len(self.items) + 7) // 8, "little")
+
+    def year_slice(self, years: "YearRange") -> Sequence[int]:
+        """Ordinals with a year inside the inclusive range, as a view on the year index"""
+        first, last = years
+        start = 0 if first is None else bisect.bisect_left(self.years_sorted, first)
+        stop = len(self.years_sorted) if last is None else bisect.bisect_right(self.years_sorted, last)
+        return OrdinalSlice(self.year_order, start, max(start, stop))
+
+    def pool(self, genres: "GenreFilter" = ((), "any"), years: "YearRange" = (None, None)) -> Sequence[int]:
+        """Ordinals matching the filters"""
+        tokens, _ = genres
+        unbounded = years == (None, None)
+        if unbounded:
+            if not tokens:
+                return range(len(self.items))
+            if len(tokens) == 1:
+                return self.genres.get(tokens[0], [])
+        elif not tokens:
+            return self.year_slice(years)
+        key = (genres, years)
+        pool = self._pools.get(key)
+        if pool is None:
+            if unbounded:
+                pool = bitset_ordinals(self.genre_bitset(genres))
+            else:
+                # One vectorized pass over the year slice: O(slice + n/8), never O(slice * n)
+                year_slice = self.year_slice(years)
+                ordinals = self.year_order_array[year_slice.start:year_slice.stop]
+                bits = np.frombuffer(self.genre_bitset(genres), dtype=np.uint8)
+                mask = np.unpackbits(bits, bitorder="little").view(bool)
+                pool = np.sort(ordinals[mask[ordinals]]).tolist()
+            self._pools[key] = pool
+            if len(self._pools) > POOL_CACHE_SIZE:
+                self._pools.popitem(last=False)
+        else:
+            self._pools.move_to_end(key)
+        return pool
+
+    def search(self, tokens: List[str], genres: "GenreFilter" = ((), "any"),
+               limit: int = 10) -> List[Tuple[tuple, int]]:
+        """Best ``limit`` matches as (rank key, ordinal) pairs, best first.
+
+        Names must contain every complete token and a word starting with the
+        last one. Names that start with the query rank first, then shorter
+        names; the keys let results from several categories be merged.
+        """
+        *complete, partial = tokens
+        bits = self.genre_bitset(genres)
+        mask = None if bits is None else \
+            np.unpackbits(np.frombuffer(bits, dtype=np.uint8), bitorder="little").view(bool)
+        ranked = self.prefix_ranked.get(partial)
+        if not complete and ranked is not None:
+            # Already in rank order: take the first matches instead of ranking them all
+            if mask is not None:
+                ranked = ranked[mask[ranked]]
+            top = ranked[:limit]
+        else:
+            if ranked is not None:
+                matches = self.prefix_sorted[partial]
+            else:
+                # A rare prefix has at most SEARCH_PREFIX_INDEX_MIN postings
+                start = bisect.bisect_left(self.vocabulary, partial)
+                stop = bisect.bisect_left(self.vocabulary, partial + "\U0010ffff")
+                matches = np.unique(np.concatenate(
+                    [self.postings[word] for word in self.vocabulary[start:stop]] + [np.empty(0, dtype=np.int64)]))
+            # Start from the smallest set and keep what the others contain
+            sets = sorted([matches, *(self.postings.get(token, np.empty(0, dtype=np.int64)) for token in complete)],
+                          key=len)
+            candidates = sets[0]
+            for ordinals in sets[1:]:
+                candidates = candidates[sorted_member(ordinals, candidates)]
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            keys = self.rank_keys(candidates, " ".join(tokens))
+            if len(candidates) > limit:
+                best = np.argpartition(keys, limit)[:limit]
+                candidates, keys = candidates[best], keys[best]
+            top = candidates[np.argsort(keys, kind="stable")]
+
+        prefix = " ".join(tokens)
+        def rank(ordinal: int) -> tuple:
+            name = self.items[ordinal]["name"]
+            starts = any(n.startswith(prefix) for n in self.search_names[ordinal])
+            return (not starts, len(name), name)
+        return [(rank(o), o) for o in top.tolist()]
+
+    def to_ordinals(self, ids: List[str]) -> Set[int]:
+        return {self.ordinals[i] for i in ids if i in self.ordinals}
+
+    def pick(self, pool: Sequence[int], excluded: Set[int]) -> Optional[int]:
+        """Pick a random ordinal from pool that is not excluded.
+
+        Falls back to the whole pool once everything has been excluded.
+        """
+        picked = self.pick_many(pool, excluded, 1)
+        return picked[0] if picked else None
+
+    def pick_many(self, pool: Sequence[int], excluded: Set[int], n: int) -> List[int]:
+        """Pick up to n distinct ordinals from pool, preferring unexcluded ones.
+
+        Once the unexcluded ordinals run out the rest are drawn from the
+        excluded ones, mirroring the reset behaviour of a single pick.
+        """
+        size = len(pool)
+        n = min(n, size)
+        if (len(excluded) + n) * 2 < size:
+            # Mostly unexcluded: rejection sampling is O(n) on average
+            chosen: Dict[int, None] = {}
+            while len(chosen) < n:
+                ordinal = pool[random.randrange(size)]
+                if ordinal not in excluded:
+                    chosen[ordinal] = None
+            return list(chosen)
+        available = [o for o in pool if o not in excluded]
+        if len(available) >= n:
+            return random.sample(available, n)
+        random.shuffle(available)
+        refill = [o for o in pool if o in excluded]
+        return available + random.sample(refill, n - len(available))
+
+    def holds(self, ordinal: int, genres: "GenreFilter", years: "YearRange") -> bool:
+        """Whether ``pool(genres, years)`` contains the ordinal, without building the pool"""
+        first, last = years
+        if years != (None, None):
+            year = self.items[ordinal].get("year")
+            if year is None or (first is not None and year < first) or (last is not None and year > last):
+                return False
+        tokens, mode = genres
+        if not tokens:
+            return True
+        tagged = (contains_sorted(self.genres.get(token, []), ordinal) for token in tokens)
+        return all(tagged) if mode == "all" else any(tagged)
+
+    def reweigh(self, weighting: str, changes: Dict[int, float], cached: List[tuple]):
+        """Patched weights plus fresh tables for the cached pools holding a changed ordinal"""
+        weights = list(self.weights[weighting])
+        for ordinal, weight in changes.items():
+            weights[ordinal] = weight
+        tables = {
+            key: (pool, AliasTable([weights[o] for o in pool]))
+            for key, (pool, _) in cached
+            if any(self.holds(ordinal, *key[1]) for ordinal in changes)
+        }
+        return weights, tables
+
+    async def update_weights(self, weighting: str, changes: Dict[int, float]):
+        """Patch some item weights and swap in the alias tables they affect.
+
+        Called from background refreshes, so requests never rebuild a table
+        for a filter they have already used. Tables are rebuilt in a worker
+        thread; only those whose pool holds a changed item are touched.
+        """
+        if not changes:
+            return
+        cached = [(key, entry) for key, entry in self._alias_tables.items() if key[0] == weighting]
+        weights, tables = await asyncio.to_thread(self.reweigh, weighting, changes, cached)
+        self.weights[weighting] = weights
+        # Tables first built while the worker ran used the old weights
+        before = {key for key, _ in cached}
+        for key in [key for key in self._alias_tables if key[0] == weighting and key not in before]:
+            del self._alias_tables[key]
+        for key, entry in tables.items():
+            if key in self._alias_tables:
+                self._alias_tables[key] = entry
+
+    def alias_table(self, weighting: str, pool: Sequence[int], pool_key: tuple) -> AliasTable:
+        key = (weighting, pool_key)
+        entry = self._alias_tables.get(key)
+        if entry is None:
+            weights = self.weights[weighting]
+            entry = pool, AliasTable([weights[o] for o in pool])
+            self._alias_tables[key] = entry
+            if len(self._alias_tables) > ALIAS_CACHE_SIZE:
+                self._alias_tables.popitem(last=False)
+        else:
+            self._alias_tables.move_to_end(key)
+        return entry[1]
+
+    def pick_many_weighted(self, pool: Sequence[int], pool_key: tuple, excluded: Set[int],
+                           n: int, weighting: str) -> List[int]:
+        """Weighted counterpart of pick_many, O(1) per pick while exclusions are light"""
+        n = min(n, len(pool))
+        table = self.alias_table(weighting, pool, pool_key)
+        chosen: Dict[int, None] = {}
+        for _ in range(8 * n + 32):
+            if len(chosen) >= n:
+                return list(chosen)
+            ordinal = pool[table.sample()]
+            if ordinal not in excluded:
+                chosen[ordinal] = None
+        # Exclusions hold most of the weight: draw from what is left directly
+        weights = self.weights[weighting]
+        available = [o for o in pool if o not in excluded and o not in chosen]
+        chosen.update(dict.fromkeys(weighted_sample(available, weights, n - len(chosen))))
+        if len(chosen) < n:
+            refill = [o for o in pool if o not in chosen]
+            chosen.update(dict.fromkeys(weighted_sample(refill, weights, n - len(chosen))))
+        return list(chosen)
+
+
+async def catalog_versions() -> Dict[str, int]:
+    return {doc["_id"]: doc["version"] async for doc in db.catalog_versions.find({})}
+
+async def bump_catalog_versions(categories):
+    """Tell every server that items of these categories were written"""
+    await db.catalog_versions.bulk_write([
+        UpdateOne({"_id": category}, {"$inc": {"version": 1}}, upsert=True) for category in categories
+    ], ordered=False)
+
+
+class CatalogIndex:
+    """Per-category indexes loaded from the category collections.
+
+    Writers bump a per-category version in ``catalog_versions``; a background
+    loop polls it every ``poll_interval`` seconds and reloads only the
+    categories that moved.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.categories: Dict[str, CategoryIndex] = {}
+        self.versions: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load_category(self, category: str, version: Optional[int] = None) -> CategoryIndex:
+        # Read the version before the items, so a write racing the load triggers another one
+        if version is None:
+            version = (await catalog_versions()).get(category, 0)
+        items = await db[category].find({}, {"_id": 0, "seed_hash": 0}).to_list(None)
+        index = await asyncio.to_thread(CategoryIndex, category, items)
+        await popularity.apply_weights(index)
+        self.categories[category] = index
+        self.versions[category] = version
+        return index
+
+    async def load(self):
+        """(Re)load every category concurrently"""
+        versions = await catalog_versions()
+        async with self._lock:
+            await asyncio.gather(*(self.load_category(c, versions.get(c, 0)) for c in CATEGORIES))
+        invalidate_catalog_cache()
+        logger.info("Catalog index loaded: %s",
+                    {c: len(i) for c, i in self.categories.items()})
+
+    async def refresh(self):
+        """Reload the categories whose version moved since they were loaded"""
+        versions = await catalog_versions()
+        stale = [c for c in self.categories if versions.get(c, 0) != self.versions.get(c)]
+        if not stale:
+            return
+        async with self._lock:
+            await asyncio.gather(*(self.load_category(c, versions.get(c, 0)) for c in stale))
+        invalidate_catalog_cache()
+        logger.info("Catalog index reloaded: %s", {c: len(self.categories[c]) for c in stale})
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.refresh()
+            except PyMongoError as exc:
+                logger.error("Could not check catalog versions: %s", exc)
+
+    def start(self):
+        self._task = start_background_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def get(self, category: str) -> CategoryIndex:
+        index = self.categories.get(category)
+        if index is None:
+            async with self._lock:
+                index = self.categories.get(category)
+                if index is None:
+                    index = await self.load_category(category)
+        return index
+
+
+catalog = CatalogIndex(poll_interval=float(os.environ.get('CATALOG_POLL_SECONDS', '10')))
+
+
+# Compact "seen" tokens
+SEEN_BITSET = 0
+SEEN_DELTAS = 1
+
+def _encode_varints(values: List[int]) -> bytes:
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+def _decode_varints(data: bytes) -> List[int]:
+    values, value, shift = [], 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            values.append(value)
+            value, shift = 0, 0
+    return values
+
+def encode_seen(index: CategoryIndex, ordinals: Set[int]) -> str:
+    """Encode seen ordinals as a bitset or delta list, whichever is smaller"""
+    bitset = bytearray((len(index) + 7) // 8)
+    for o in ordinals:
+        bitset[o >> 3] |= 1 << (o & 7)
+    previous, deltas = -1, []
+    for o in sorted(ordinals):
+        deltas.append(o - previous - 1)
+        previous = o
+    candidates = [
+        (SEEN_BITSET, zlib.compress(bytes(bitset), 9)),
+        (SEEN_DELTAS, _encode_varints(deltas)),
+    ]
+    kind, payload = min(candidates, key=lambda c: len(c[1]))
+    raw = index.version + bytes([kind]) + payload
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_seen(index: CategoryIndex, token: str) -> Set[int]:
+    """Decode a seen token; stale or malformed tokens decode to an empty set"""
+    if not token:
+        return set()
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        if raw[:4] != index.version:
+            return set()
+        kind, payload = raw[4], raw[5:]
+        if kind == SEEN_BITSET:
+            # Never inflate past the size of a bitset for this catalog
+            decompressor = zlib.decompressobj()
+            bitset = decompressor.decompress(payload, (len(index) + 7) // 8)
+            if decompressor.unconsumed_tail:
+                return set()
+            return {o for o in bitset_ordinals(bitset) if o < len(index)}
+        if kind == SEEN_DELTAS:
+            ordinals, previous = set(), -1
+            for delta in _decode_varints(payload):
+                previous += delta + 1
+                if previous >= len(index):
+                    break
+                ordinals.add(previous)
+            return ordinals
+    except (ValueError, IndexError, zlib.error):
+        pass
+    return set()
+
+
+# Shuffle deck sessions
+class ShuffleDeck:
+    """Lazy Fisher-Yates permutation of a pool.
+
+    Only displaced positions are stored, so memory grows with the number of
+    cards dealt rather than with the size of the pool.
+    """
+    __slots__ = ("key", "index", "pool", "swaps", "cursor", "expires_at")
+
+    def __init__(self, key: tuple, index: CategoryIndex, pool: Sequence[int]):
+        self.key = key
+        self.index = index
+        self.pool = pool
+        self.swaps: Dict[int, int] = {}
+        self.cursor = 0
+        self.expires_at = 0.0
+
+    def deal(self) -> int:
+        size = len(self.pool)
+        if self.cursor >= size:
+            # Every card has been dealt: start a fresh shuffle
+            self.swaps.clear()
+            self.cursor = 0
+        i = self.cursor
+        j = random.randrange(i, size)
+        dealt = self.swaps.get(j, j)
+        self.swaps[j] = self.swaps.pop(i, i)
+        self.cursor += 1
+        return self.pool[dealt]
+
+
+class DeckSessions:
+    """Bounded LRU of shuffle decks that expire after a period of inactivity"""
+
+    def __init__(self, max_sessions: int, ttl: float):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._decks: "OrderedDict[str, ShuffleDeck]" = OrderedDict()
+
+    def get(self, token: str, key: tuple) -> Optional[ShuffleDeck]:
+        deck = self._decks.get(token)
+        if deck is None:
+            return None
+        if deck.expires_at < time.monotonic() or deck.key != key:
+            del self._decks[token]
+            return None
+        self._decks.move_to_end(token)
+        deck.expires_at = time.monotonic() + self.ttl
+        return deck
+
+    def create(self, key: tuple, index: CategoryIndex, pool: Sequence[int]) -> tuple:
+        while len(self._decks) >= self.max_sessions:
+            self._decks.popitem(last=False)
+        token = secrets.token_urlsafe(16)
+        deck = ShuffleDeck(key, index, pool)
+        deck.expires_at = time.monotonic() + self.ttl
+        self._decks[token] = deck
+        return token, deck
+
+
+deck_sessions = DeckSessions(
+    max_sessions=int(os.environ.get('DECK_MAX_SESSIONS', '10000')),
+    ttl=float(os.environ.get('DECK_SESSION_TTL_SECONDS', '1800')),
+)
+
+def to_suggestion(item: dict, category: str) -> Suggestion:
+    return Suggestion(
+        id=item["id"],
+        name=item["name"],
+        name_ar=item["name_ar"],
+        category=item["category"],
+        year=item.get("year"),
+        genre=item.get("genre"),
+        external_url=item.get("external_url") or get_external_url(item["name"], category)
+    )
+
+# Derived catalog data served by read endpoints, cleared on catalog writes
+catalog_cache: Dict[str, object] = {}
+
+def invalidate_catalog_cache():
+    catalog_cache.clear()
+
 # Seed database on startup
+# Seeded ids are derived from category and name so every environment agrees on them
+CATALOG_ID_NAMESPACE = uuid.UUID("6f1c7a52-3d0e-4b8a-9a61-2f4d8c0e5b17")
+SEED_BATCH_SIZE = 1000
+
+def catalog_item_id(category: str, name: str) -> str:
+    return str(uuid.uuid5(CATALOG_ID_NAMESPACE, f"{category}/{name}"))
+
+def seed_doc(category: str, item: dict) -> dict:
+    doc = {
+        "id": catalog_item_id(category, item["name"]),
+        "name": item["name"],
+        "name_ar": item["name_ar"],
+        "category": category,
+        "year": item.get("year"),
+        "genre": item.get("genre"),
+    }
+    if item.get("weight") is not None:
+        doc["weight"] = float(item["weight"])
+    return derive_fields(doc)
+
+def content_hash(value) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class BulkWriter:
+    """Run unordered bulk_write batches concurrently, at most ``concurrency`` at a time.
+
+    ``submit`` waits for a free slot, so producers cannot run ahead of the
+    database.
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, collection: str, requests: list, on_done: Optional[Callable[[], None]] = None):
+        await self._slots.acquire()
+        task = asyncio.create_task(self._write(collection, requests, on_done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, collection: str, requests: list, on_done: Optional[Callable[[], None]]):
+        try:
+            result = await db[collection].bulk_write(requests, ordered=False)
+        finally:
+            self._slots.release()
+        if on_done is not None:
+            on_done()
+        return result
+
+    async def wait(self):
+        await asyncio.gather(*self._tasks)
+
+async def remap_favorites(category: str, new_ids: Dict[str, str]):
+    """Point favorites of re-seeded items at their new ids"""
+    old_ids = list(new_ids)
+    try:
+        await db.favorites.bulk_write([
+            UpdateMany({"category": category, "item_id": old_id}, {"$set": {"item_id": new_ids[old_id]}})
+            for old_id in old_ids
+        ], ordered=False)
+    except BulkWriteError as exc:
+        if any(error["code"] != 11000 for error in exc.details["writeErrors"]):
+            raise
+        # The item was already favorited under its new id; the old favorite is a duplicate
+        duplicates = [old_ids[error["index"]] for error in exc.details["writeErrors"]]
+        await db.favorites.delete_many({"category": category, "item_id": {"$in": duplicates}})
+    logger.info("Remapped favorites of %d re-seeded %s items", len(new_ids), category)
+
 async def seed_database():
-    """Seed the database with entertainment data if empty"""
-    for category, items in ENTERTAINMENT_DATA.items():
+    """Apply changes in the catalog file, skipping categories whose content hash is unchanged
+
+    The file is streamed twice: once to hash every item and, only if some
+    category changed, again to upsert the changed items in batches. The
+    manifest holds one hash per category; per-item hashes are stored on the
+    seeded items as ``seed_hash`` and only read for changed categories.
+    """
+    hashes: Dict[str, Dict[str, str]] = {category: {} for category in CATEGORIES}
+    names: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+    for item in iter_catalog_items():
+        doc = seed_doc(item["category"], item)
+        hashes[doc["category"]][doc["id"]] = content_hash(doc)
+        names[doc["category"]].append(doc["name"])
+    
+    manifests = {m["_id"]: m["hash"] async for m in db.catalog_manifest.find({}, {"hash": 1})}
+    catalog_hashes = {category: content_hash(sorted(h.values())) for category, h in hashes.items()}
+    changed = {category for category in CATEGORIES if manifests.get(category) != catalog_hashes[category]}
+    if not changed:
+        return
+    
+    previous: Dict[str, Dict[str, str]] = {}
+    for category in changed:
         collection = db[category]
-        count = await collection.count_documents({})
-        if count == 0:
-            docs = []
-            for item in items:
-                doc = {
-                    "id": str(uuid.uuid4()),
-                    "name": item["name"],
-                    "name_ar": item["name_ar"],
-                    "category": category,
-                    "year": item.get("year"),
-                    "genre": item.get("genre"),
-                }
-                docs.append(doc)
-            if docs:
-                await collection.insert_many(docs)
-                logging.info(f"Seeded {len(docs)} items in {category}")
+        previous[category] = {
+            doc["id"]: doc["seed_hash"]
+            async for doc in collection.find({"seed_hash": {"$exists": True}}, {"_id": 0, "id": 1, "seed_hash": 1})
+        }
+        if category not in manifests:
+            # Databases seeded before the manifest hold the same names under random ids
+            legacy = await collection.find(
+                {"name": {"$in": names[category]}, "id": {"$nin": list(hashes[category])}},
+                {"_id": 0, "id": 1, "name": 1},
+            ).to_list(None)
+            if legacy:
+                await remap_favorites(category, {doc["id"]: catalog_item_id(category, doc["name"]) for doc in legacy})
+                await collection.delete_many({"id": {"$in": [doc["id"] for doc in legacy]}})
+        removed = [item_id for item_id in previous[category] if item_id not in hashes[category]]
+        if removed:
+            await collection.delete_many({"id": {"$in": removed}})
+    
+    writer = BulkWriter()
+    pending: Dict[str, list] = {category: [] for category in changed}
+    upserted = dict.fromkeys(changed, 0)
+    for item in iter_catalog_items():
+        category = item["category"]
+        if category not in changed:
+            continue
+        doc = seed_doc(category, item)
+        doc["seed_hash"] = hashes[category][doc["id"]]
+        if previous[category].get(doc["id"]) == doc["seed_hash"]:
+            continue
+        pending[category].append(UpdateOne({"id": doc["id"]}, {"$set": doc}, upsert=True))
+        upserted[category] += 1
+        if len(pending[category]) >= SEED_BATCH_SIZE:
+            await writer.submit(category, pending[category])
+            pending[category] = []
+    for category, requests in pending.items():
+        if requests:
+            await writer.submit(category, requests)
+    await writer.wait()
+    
+    for category in changed:
+        await db.catalog_manifest.replace_one(
+            {"_id": category}, {"hash": catalog_hashes[category]}, upsert=True)
+        logger.info("Seeded %s: %d upserted", category, upserted[category])
+    await bump_catalog_versions(changed)
+    invalidate_catalog_cache()
+
+# Raw status checks older than this are expired by a TTL index (unset keeps them forever)
+STATUS_RETENTION_DAYS = os.environ.get('STATUS_RETENTION_DAYS', '')
+# Days to keep per-minute status rollups; hourly rollups are kept indefinitely
+STATUS_MINUTE_ROLLUP_DAYS = os.environ.get('STATUS_MINUTE_ROLLUP_DAYS', '7')
+
+# Index registry: every index the queries above rely on, per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    **{
+        category: [
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True, background=True),
+            IndexModel([("genre_tokens", ASCENDING)], name="genre_tokens", background=True),
+            IndexModel([("year", ASCENDING)], name="year", background=True),
+        ]
+        for category in CATEGORIES
+    },
+    "status_checks": [
+        IndexModel([("timestamp", ASCENDING), ("id", ASCENDING)], name="timestamp_id", background=True),
+        *(
+            [IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", background=True,
+                        expireAfterSeconds=int(float(STATUS_RETENTION_DAYS) * 86400))]
+            if STATUS_RETENTION_DAYS else []
+        ),
+    ],
+    "status_rollups": [
+        IndexModel([("granularity", ASCENDING), ("client_name", ASCENDING), ("bucket", ASCENDING)],
+                   name="granularity_client_bucket", unique=True, background=True),
+        IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING)], name="granularity_bucket", background=True),
+        *(
+            [IndexModel([("bucket", ASCENDING)], name="minute_bucket_ttl", background=True,
+                        expireAfterSeconds=int(float(STATUS_MINUTE_ROLLUP_DAYS) * 86400),
+                        partialFilterExpression={"granularity": "minute"})]
+            if STATUS_MINUTE_ROLLUP_DAYS else []
+        ),
+    ],
+    "popularity": [
+        IndexModel([("category", ASCENDING), ("item_id", ASCENDING)], name="category_item_unique",
+                   unique=True, background=True),
+        IndexModel([("category", ASCENDING), ("score", DESCENDING)], name="category_score", background=True),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at", background=True),
+    ],
+    "favorites": [
+        IndexModel([("item_id", ASCENDING)], name="item_id_unique", unique=True, background=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id", background=True),
+    ],
+}
+
+INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+async def ensure_collection_indexes(name: str, models: List[IndexModel]):
+    collection = db[name]
+    existing = await collection.index_information()
+    missing = []
+    for model in models:
+        spec = model.document
+        current = existing.get(spec["name"])
+        if current is None:
+            missing.append(model)
+            continue
+        wanted = {k: spec.get(k) for k in INDEX_OPTIONS}
+        actual = {k: current.get(k) for k in INDEX_OPTIONS}
+        if list(spec["key"].items()) != [tuple(k) for k in current["key"]] or wanted != actual:
+            logger.warning("Index drift on %s.%s: expected %s %s, found %s %s", name, spec["name"],
+                           dict(spec["key"]), wanted, current["key"], actual)
+    registered = {model.document["name"] for model in models}
+    for extra in sorted(set(existing) - registered - {"_id_"}):
+        logger.warning("Index drift on %s: unregistered index %s", name, extra)
+    if missing:
+        created = await collection.create_indexes(missing)
+        logger.info("Created indexes on %s: %s", name, created)
+
+async def ensure_indexes():
+    """Create missing registered indexes; idempotent and safe on every boot"""
+    async def ensure(name, models):
+        try:
+            await ensure_collection_indexes(name, models)
+        except PyMongoError as exc:
+            logger.error("Could not ensure indexes on %s: %s", name, exc)
+    await asyncio.gather(*(ensure(name, models) for name, models in INDEXES.items()))
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+background_tasks: Set[asyncio.Task] = set()
+
+def start_background_task(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# Popularity: events are counted in process and flushed as batched $inc upserts
+POPULARITY_WEIGHTS = {"impressions": 1, "clicks": 5, "favorites": 20}
+# Seconds of overlap between incremental weight refreshes
+POPULARITY_WEIGHTS_OVERLAP = 30
+
+class PopularityTracker:
+    """Aggregate impressions, clicks and favorite adds and serve a cached top-K.
+
+    Nothing is written on the request path: counts accumulate in memory and
+    a background loop flushes them every ``flush_interval`` seconds and
+    refreshes the per-category top lists every ``refresh_interval``.
+    """
+
+    def __init__(self, flush_interval: float, refresh_interval: float, top_k: int):
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.top_k = top_k
+        self.top: Dict[str, List[dict]] = {}
+        # Sampling weight per item id, per category, kept current by refresh_weights
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self._weights_seen_until: Optional[datetime] = None
+        self._counts: Dict[tuple, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, category: str, item_ids, event: str):
+        for item_id in item_ids:
+            key = (category, item_id, event)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    async def flush(self):
+        counts, self._counts = self._counts, {}
+        if not counts:
+            return
+        updates: Dict[tuple, Dict[str, int]] = {}
+        for (category, item_id, event), count in counts.items():
+            inc = updates.setdefault((category, item_id), {"score": 0})
+            inc[event] = count
+            inc["score"] += count * POPULARITY_WEIGHTS[event]
+        try:
+            await db.popularity.bulk_write([
+                UpdateOne({"category": category, "item_id": item_id},
+                          {"$inc": inc, "$currentDate": {"updated_at": True}}, upsert=True)
+                for (category, item_id), inc in updates.items()
+            ], ordered=False)
+        except PyMongoError as exc:
+            # Keep the counts for the next flush rather than losing them
+            for key, count in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + count
+            logger.error("Could not flush popularity counters: %s", exc)
+
+    async def refresh(self):
+        async def top(category):
+            return await db.popularity.find({"category": category}, {"_id": 0}) \
+                .sort("score", -1).limit(self.top_k).to_list(self.top_k)
+        results = await asyncio.gather(*(top(category) for category in CATEGORIES))
+        self.top = dict(zip(CATEGORIES, results))
+        await self.refresh_weights()
+
+    async def refresh_weights(self):
+        """Read only popularity rows updated since the last refresh and patch loaded indexes"""
+        started = datetime.now(timezone.utc)
+        query = {}
+        if self._weights_seen_until is not None:
+            # Overlap a little so writes committed during the last read are not missed
+            query["updated_at"] = {"$gte": self._weights_seen_until - timedelta(seconds=POPULARITY_WEIGHTS_OVERLAP)}
+        changed: Dict[str, Dict[str, float]] = {}
+        find = db.popularity.find(query, {"_id": 0, "category": 1, "item_id": 1, "clicks": 1, "favorites": 1})
+        async for doc in find:
+            # Impressions are left out so that served items do not feed their own weight
+            weight = 1.0 + sum(doc.get(event, 0) * POPULARITY_WEIGHTS[event] for event in ("clicks", "favorites"))
+            weights = self.weights.setdefault(doc["category"], {})
+            if weights.get(doc["item_id"]) != weight:
+                weights[doc["item_id"]] = weight
+                changed.setdefault(doc["category"], {})[doc["item_id"]] = weight
+        self._weights_seen_until = started
+        for category, weights in changed.items():
+            index = catalog.categories.get(category)
+            if index is not None:
+                await index.update_weights("popularity", {
+                    index.ordinals[item_id]: weight
+                    for item_id, weight in weights.items() if item_id in index.ordinals
+                })
+
+    async def apply_weights(self, index: CategoryIndex):
+        """Give a freshly loaded index the popularity weights known so far"""
+        weights = self.weights.get(index.category, {})
+        await index.update_weights("popularity", {
+            index.ordinals[item_id]: weight for item_id, weight in weights.items() if item_id in index.ordinals
+        })
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        next_refresh = 0.0
+        while True:
+            await self.flush()
+            if loop.time() >= next_refresh:
+                try:
+                    await self.refresh()
+                except PyMongoError as exc:
+                    logger.error("Could not refresh popular items: %s", exc)
+                next_refresh = loop.time() + self.refresh_interval
+            await asyncio.sleep(self.flush_interval)
+
+    def start(self):
+        self._task = start_background_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+popularity = PopularityTracker(
+    flush_interval=float(os.environ.get('POPULARITY_FLUSH_SECONDS', '5')),
+    refresh_interval=float(os.environ.get('POPULARITY_REFRESH_SECONDS', '60')),
+    top_k=int(os.environ.get('POPULAR_TOP_K', '100')),
+)
 
 @app.on_event("startup")
 async def startup_event():
+    start_background_task(ensure_indexes())
+    # Fix the rollup cutoff before serving, so every live check is at or after it
+    await status_rollups_cutoff()
+    start_background_task(prepare_status_checks())
+    if status_buffer is not None:
+        status_buffer.start()
+    status_rollups.start()
     await seed_database()
+    await catalog.load()
+    catalog.start()
+    popularity.start()
 
 # Routes
 @api_router.get("/")
@@ -525,147 +1247,386 @@ async def root():
 @api_router.get("/categories")
 async def get_categories():
     """Get all available categories with counts"""
-    categories = []
-    for cat_name in ENTERTAINMENT_DATA.keys():
-        count = await db[cat_name].count_documents({})
-        categories.append({
-            "id": cat_name,
-            "name": cat_name,
-            "name_ar": {
-                "games": "ألعاب",
-                "movies": "أفلام",
-                "series": "مسلسلات",
-                "youtube": "يوتيوب"
-            }.get(cat_name, cat_name),
-            "count": count
-        })
+    categories = catalog_cache.get("categories")
+    if categories is None:
+        names = list(CATEGORIES)
+        counts = await asyncio.gather(*(db[name].count_documents({}) for name in names))
+        categories = [
+            {
+                "id": name,
+                "name": name,
+                "name_ar": CATEGORIES[name],
+                "count": count
+            }
+            for name, count in zip(names, counts)
+        ]
+        catalog_cache["categories"] = categories
     return categories
 
 @api_router.get("/genres/{category}")
 async def get_genres(category: str):
-    """Get all unique genres for a category"""
-    if category not in ENTERTAINMENT_DATA:
+    """Get all unique genres for a category with the number of items in each"""
+    if category not in CATEGORIES:
         raise HTTPException(status_code=404, detail="الفئة غير موجودة")
     
-    collection = db[category]
-    genres = await collection.distinct("genre")
-    genres = [g for g in genres if g]  # Remove None values
-    return {"genres": sorted(genres)}
+    index = await catalog.get(category)
+    return {
+        "genres": [facet["genre"] for facet in index.genre_facets],
+        "facets": index.genre_facets
+    }
 
-@api_router.get("/suggest/{category}", response_model=SuggestionResponse)
-async def get_random_suggestion(category: str, exclude_ids: str = "", genre: str = ""):
-    """Get a random suggestion from a category, optionally excluding certain IDs and filtering by genre"""
-    if category not in ENTERTAINMENT_DATA:
+# Weighted modes for suggestions; "" keeps picks uniform
+WEIGHTINGS = ("", "popularity", "editorial")
+
+async def suggest_ordinals(category: str, genres: GenreFilter, years: YearRange, exclude_ids: str,
+                           session: Optional[str], seen: Optional[str], n: int, weighting: str = ""):
+    """Shared sampling for the single and batch suggest endpoints"""
+    if category not in CATEGORIES:
         raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    if weighting not in WEIGHTINGS:
+        raise HTTPException(status_code=400, detail="طريقة الترجيح غير صالحة")
     
-    collection = db[category]
-    
-    # Build query
-    query = {}
-    
-    # Parse excluded IDs
-    excluded = []
-    if exclude_ids:
-        excluded = exclude_ids.split(",")
-    if excluded:
-        query["id"] = {"$nin": excluded}
-    
-    # Filter by genre if provided
-    if genre:
-        query["genre"] = genre
+    if session is not None:
+        key = (category, genres, years)
+        deck = deck_sessions.get(session, key) if session else None
+        if deck is None:
+            index = await catalog.get(category)
+            pool = index.pool(genres, years)
+            if not pool:
+                raise HTTPException(status_code=404, detail="لا توجد اقتراحات متاحة لهذا النوع")
+            session, deck = deck_sessions.create(key, index, pool)
+        
+        picked: Dict[int, None] = {}
+        while len(picked) < min(n, len(deck.pool)):
+            picked[deck.deal()] = None
+        popularity.record(category, (deck.index.items[o]["id"] for o in picked), "impressions")
+        return deck.index, list(picked), len(deck.pool), session, None
     
-    total = await collection.count_documents(query if genre else {})
+    index = await catalog.get(category)
+    pool = index.pool(genres, years)
+    excluded = index.to_ordinals(exclude_ids.split(",")) if exclude_ids else set()
+    if seen:
+        excluded |= decode_seen(index, seen)
     
-    # Get count of available items
-    available_count = await collection.count_documents(query)
+    if not weighting:
+        ordinals = index.pick_many(pool, excluded, n)
+    else:
+        ordinals = index.pick_many_weighted(pool, (genres, years), excluded, n, weighting)
+    if not ordinals:
+        raise HTTPException(status_code=404, detail="لا توجد اقتراحات متاحة لهذا النوع")
     
-    # If all items have been shown, reset exclusion (keep genre filter)
-    if available_count == 0:
-        if excluded:
-            query.pop("id", None)
-            available_count = await collection.count_documents(query)
-        if available_count == 0:
-            raise HTTPException(status_code=404, detail="لا توجد اقتراحات متاحة لهذا النوع")
+    seen_token = None
+    if seen is not None:
+        if any(o in excluded for o in ordinals):
+            # The pool was exhausted and sampling started over
+            excluded = set()
+        excluded.update(ordinals)
+        seen_token = encode_seen(index, excluded)
     
-    # Get random item using aggregation
-    pipeline = [
-        {"$match": query},
-        {"$sample": {"size": 1}},
-        {"$project": {"_id": 0}}
-    ]
-    
-    cursor = collection.aggregate(pipeline)
-    items = await cursor.to_list(1)
-    
-    if not items:
+    popularity.record(category, (index.items[o]["id"] for o in ordinals), "impressions")
+    return index, ordinals, len(pool), None, seen_token
+
+def parse_category_weights(weights: str) -> Dict[str, float]:
+    """Parse ``games:2,movies:1`` into a weight per category"""
+    parsed = {}
+    for part in weights.split(","):
+        name, _, value = part.partition(":")
+        name = name.strip()
+        try:
+            weight = float(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="أوزان غير صالحة")
+        if name not in CATEGORIES or weight < 0:
+            raise HTTPException(status_code=400, detail="أوزان غير صالحة")
+        parsed[name] = weight
+    return parsed
+
+@api_router.get("/suggest/any", response_model=SuggestionResponse)
+async def get_random_suggestion_any(weights: str = "", exclude_ids: str = ""):
+    """Get a random suggestion across all categories
+
+    Categories are weighted by ``weights`` (e.g. ``games:2,movies:1``) or, by
+    default, by their size, which makes every item equally likely.
+    """
+    indexes = [await catalog.get(category) for category in CATEGORIES]
+    if weights:
+        parsed = parse_category_weights(weights)
+        category_weights = [parsed.get(index.category, 0.0) if len(index) else 0.0 for index in indexes]
+    else:
+        category_weights = [float(len(index)) for index in indexes]
+    if not any(category_weights):
         raise HTTPException(status_code=404, detail="لا توجد اقتراحات متاحة")
     
-    item = items[0]
-    suggestion = Suggestion(
-        id=item["id"],
-        name=item["name"],
-        name_ar=item["name_ar"],
-        category=item["category"],
-        year=item.get("year"),
-        genre=item.get("genre"),
-        external_url=get_external_url(item["name"], category)
-    )
+    index = random.choices(indexes, weights=category_weights)[0]
+    excluded = index.to_ordinals(exclude_ids.split(",")) if exclude_ids else set()
+    ordinal = index.pick(index.pool(), excluded)
+    popularity.record(index.category, [index.items[ordinal]["id"]], "impressions")
+    suggestion = to_suggestion(index.items[ordinal], index.category)
+    return SuggestionResponse(suggestion=suggestion, total_in_category=sum(len(i) for i in indexes))
+
+@api_router.get("/suggest/{category}", response_model=SuggestionResponse)
+async def get_random_suggestion(category: str, exclude_ids: str = "", genre: str = "", genre_mode: str = "any",
+                                year_from: Optional[int] = None, year_to: Optional[int] = None,
+                                decade: Optional[int] = None, weighting: str = "",
+                                session: Optional[str] = None, seen: Optional[str] = None):
+    """Get a random suggestion from a category, optionally excluding certain IDs and filtering by genre
+
+    Passing ``session`` (empty to start one) switches to a server-side shuffle
+    deck that never repeats until the whole pool has been dealt. Passing
+    ``seen`` (empty to start) uses a stateless compact token instead of
+    ``exclude_ids``; the updated token is returned with each suggestion.
+    ``genre`` takes comma-separated genres matched by ``genre_mode``
+    (``any`` or ``all``); ``year_from``/``year_to`` and ``decade`` narrow the
+    pick to items from those years. ``weighting=popularity`` or ``editorial``
+    biases picks by item weight; shuffle deck sessions always deal uniformly.
+    """
+    index, ordinals, total, session, seen = await suggest_ordinals(
+        category, parse_genre_filter(genre, genre_mode), parse_year_range(year_from, year_to, decade),
+        exclude_ids, session, seen, 1, weighting)
+    suggestion = to_suggestion(index.items[ordinals[0]], category)
+    return SuggestionResponse(suggestion=suggestion, total_in_category=total,
+                              session=session, seen=seen)
+
+@api_router.get("/suggest/{category}/batch", response_model=SuggestionBatchResponse)
+async def get_random_suggestions(category: str, n: int = Query(5, ge=1, le=50), exclude_ids: str = "",
+                                 genre: str = "", genre_mode: str = "any",
+                                 year_from: Optional[int] = None, year_to: Optional[int] = None,
+                                 decade: Optional[int] = None, weighting: str = "",
+                                 session: Optional[str] = None, seen: Optional[str] = None):
+    """Get up to n distinct random suggestions with the same filters as /suggest/{category}"""
+    index, ordinals, total, session, seen = await suggest_ordinals(
+        category, parse_genre_filter(genre, genre_mode), parse_year_range(year_from, year_to, decade),
+        exclude_ids, session, seen, n, weighting)
+    suggestions = [to_suggestion(index.items[o], category) for o in ordinals]
+    return SuggestionBatchResponse(suggestions=suggestions, total_in_category=total,
+                                   session=session, seen=seen)
+
+@api_router.get("/search")
+async def search_catalog(q: str, category: str = "", genre: str = "", genre_mode: str = "any",
+                         limit: int = Query(10, ge=1, le=50)):
+    """Autocomplete over English and Arabic names
+
+    Every word of ``q`` must match a word of the name, the last one as a
+    prefix. Names that start with the query rank first, then shorter names.
+    """
+    if category and category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    genres = parse_genre_filter(genre, genre_mode)
+    tokens = search_tokens(q)
+    if not tokens:
+        return {"results": []}
     
-    return SuggestionResponse(suggestion=suggestion, total_in_category=total)
+    ranked = []
+    for name in ([category] if category else CATEGORIES):
+        index = await catalog.get(name)
+        ranked.extend((key, index, ordinal) for key, ordinal in index.search(tokens, genres, limit))
+    ranked.sort(key=lambda r: r[0])
+    return {"results": [to_suggestion(index.items[o], index.category) for _, index, o in ranked[:limit]]}
+
+@api_router.get("/similar/{category}/{item_id}")
+async def get_similar(category: str, item_id: str, limit: int = Query(10, ge=1, le=50)):
+    """Get items similar to the given one by genre and year"""
+    if category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    index = await catalog.get(category)
+    ordinal = index.ordinals.get(item_id)
+    if ordinal is None:
+        raise HTTPException(status_code=404, detail="العنصر غير موجود")
+    return {
+        "item": to_suggestion(index.items[ordinal], category),
+        "similar": [to_suggestion(index.items[o], category) for o in index.similar(ordinal, limit)]
+    }
+
+@api_router.post("/clicks/{category}/{item_id}")
+async def record_click(category: str, item_id: str):
+    """Record that an item's external link was opened"""
+    if category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    index = await catalog.get(category)
+    if item_id not in index.ordinals:
+        raise HTTPException(status_code=404, detail="العنصر غير موجود")
+    popularity.record(category, [item_id], "clicks")
+    return {"message": "تم التسجيل"}
+
+@api_router.get("/popular/{category}")
+async def get_popular(category: str, limit: int = Query(20, ge=1, le=100)):
+    """Get the most popular items in a category from the cached top list"""
+    if category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    index = await catalog.get(category)
+    items = []
+    for entry in popularity.top.get(category, []):
+        ordinal = index.ordinals.get(entry["item_id"])
+        if ordinal is None:
+            continue
+        items.append({
+            "suggestion": to_suggestion(index.items[ordinal], category),
+            "score": entry.get("score", 0),
+            **{event: entry.get(event, 0) for event in POPULARITY_WEIGHTS},
+        })
+        if len(items) >= limit:
+            break
+    return {"items": items}
+
+def encode_cursor(values: list) -> str:
+    """Opaque pagination cursor holding the sort key of the last item"""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Values of a cursor made by encode_cursor; all of them are strings"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    # Anything else (an operator document such as {"$gt": ""}) would end up in a query
+    if not isinstance(values, list) or len(values) != size or \
+            not all(isinstance(value, str) for value in values):
+        raise HTTPException(status_code=400, detail="مؤشر الصفحة غير صالح")
+    return values
 
 @api_router.get("/all/{category}")
-async def get_all_in_category(category: str, skip: int = 0, limit: int = 20):
-    """Get all items in a category with pagination"""
-    if category not in ENTERTAINMENT_DATA:
+async def get_all_in_category(category: str, skip: int = 0, limit: int = 20,
+                              cursor: str = "", include_total: bool = True,
+                              genre: str = "", genre_mode: str = "any",
+                              year_from: Optional[int] = None, year_to: Optional[int] = None,
+                              decade: Optional[int] = None):
+    """Get all items in a category with pagination
+
+    Items are ordered by id. Pass the returned ``next_cursor`` as ``cursor``
+    to fetch the following page at constant cost; ``skip`` is kept for
+    older clients. Genre and year filters work as in /suggest/{category}.
+    """
+    if category not in CATEGORIES:
         raise HTTPException(status_code=404, detail="الفئة غير موجودة")
+    genres = parse_genre_filter(genre, genre_mode)
+    years = parse_year_range(year_from, year_to, decade)
     
     collection = db[category]
-    total = await collection.count_documents({})
-    items = await collection.find({}, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
+    query = {}
+    tokens, mode = genres
+    if tokens:
+        query["genre_tokens"] = {"$all" if mode == "all" else "$in": list(tokens)}
+    if years != (None, None):
+        first, last = years
+        query["year"] = {}
+        if first is not None:
+            query["year"]["$gte"] = first
+        if last is not None:
+            query["year"]["$lte"] = last
+    if cursor:
+        last_id, = decode_cursor(cursor, 1)
+        query["id"] = {"$gt": last_id}
+    find = collection.find(query, {"_id": 0, "search_key": 0, "seed_hash": 0}).sort("id", 1)
+    if not cursor and skip:
+        find = find.skip(skip)
+    items = await find.limit(limit).to_list(limit)
     
-    # Add external URLs
+    # Items ingested before derived fields existed
     for item in items:
-        item["external_url"] = get_external_url(item["name"], category)
+        if "external_url" not in item:
+            item["external_url"] = get_external_url(item["name"], category)
+    
+    next_cursor = None
+    if limit and len(items) == limit:
+        next_cursor = encode_cursor([items[-1]["id"]])
+    
+    total = None
+    if include_total:
+        total = len((await catalog.get(category)).pool(genres, years))
     
     return {
         "items": items,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 # Favorites endpoints
-@api_router.post("/favorites")
-async def add_favorite(favorite: FavoriteCreate):
-    """Add an item to favorites"""
-    # Check if already in favorites
-    existing = await db.favorites.find_one({"item_id": favorite.item_id}, {"_id": 0})
-    if existing:
-        raise HTTPException(status_code=400, detail="موجود في المفضلة مسبقاً")
-    
-    # Get item details from category collection
-    collection = db[favorite.category]
-    item = await collection.find_one({"id": favorite.item_id}, {"_id": 0})
-    if not item:
-        raise HTTPException(status_code=404, detail="العنصر غير موجود")
-    
-    # Create favorite document
-    fav_doc = {
+def favorite_doc(item: dict, category: str) -> dict:
+    return {
         "id": str(uuid.uuid4()),
-        "item_id": favorite.item_id,
-        "category": favorite.category,
+        "item_id": item["id"],
+        "category": category,
         "name": item["name"],
         "name_ar": item["name_ar"],
         "year": item.get("year"),
         "genre": item.get("genre"),
-        "external_url": get_external_url(item["name"], favorite.category),
+        "external_url": item.get("external_url") or get_external_url(item["name"], category),
         "created_at": datetime.now(timezone.utc).isoformat()
     }
+
+@api_router.post("/favorites")
+async def add_favorite(favorite: FavoriteCreate):
+    """Add an item to favorites"""
+    if favorite.category not in CATEGORIES:
+        raise HTTPException(status_code=404, detail="العنصر غير موجود")
+    
+    # Get item details from the in-memory catalog
+    index = await catalog.get(favorite.category)
+    ordinal = index.ordinals.get(favorite.item_id)
+    if ordinal is None:
+        raise HTTPException(status_code=404, detail="العنصر غير موجود")
+    fav_doc = favorite_doc(index.items[ordinal], favorite.category)
     
-    await db.favorites.insert_one(fav_doc)
-    fav_doc.pop("_id", None)
+    # Insert only if absent; the unique item_id index settles concurrent upserts
+    try:
+        result = await db.favorites.update_one(
+            {"item_id": favorite.item_id}, {"$setOnInsert": fav_doc}, upsert=True)
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        raise HTTPException(status_code=400, detail="موجود في المفضلة مسبقاً")
+    popularity.record(favorite.category, [favorite.item_id], "favorites")
     return fav_doc
 
+@api_router.post("/favorites/batch")
+async def add_favorites(batch: FavoriteBatchCreate):
+    """Add many items to favorites in one unordered bulk write"""
+    docs, not_found = [], []
+    for favorite in batch.items:
+        index = await catalog.get(favorite.category) if favorite.category in CATEGORIES else None
+        ordinal = index.ordinals.get(favorite.item_id) if index else None
+        if ordinal is None:
+            not_found.append(favorite.item_id)
+        else:
+            docs.append(favorite_doc(index.items[ordinal], favorite.category))
+    docs = list({doc["item_id"]: doc for doc in docs}.values())
+    
+    upserted = set()
+    if docs:
+        requests = [UpdateOne({"item_id": doc["item_id"]}, {"$setOnInsert": doc}, upsert=True) for doc in docs]
+        try:
+            result = await db.favorites.bulk_write(requests, ordered=False)
+            upserted = set(result.upserted_ids)
+        except BulkWriteError as exc:
+            # Duplicate keys only mean a concurrent request added the item first
+            if any(error["code"] != 11000 for error in exc.details["writeErrors"]):
+                raise
+            upserted = {entry["index"] for entry in exc.details["upserted"]}
+    
+    for i in upserted:
+        popularity.record(docs[i]["category"], [docs[i]["item_id"]], "favorites")
+    return {
+        "added": [doc for i, doc in enumerate(docs) if i in upserted],
+        "existing": [doc["item_id"] for i, doc in enumerate(docs) if i not in upserted],
+        "not_found": not_found
+    }
+
+@api_router.post("/favorites/batch/remove")
+async def remove_favorites(batch: FavoriteIds):
+    """Remove many items from favorites"""
+    result = await db.favorites.delete_many({"item_id": {"$in": batch.item_ids}})
+    return {"deleted": result.deleted_count}
+
+@api_router.post("/favorites/check")
+async def check_favorites(batch: FavoriteIds):
+    """Check which of the given items are in favorites"""
+    cursor = db.favorites.find({"item_id": {"$in": batch.item_ids}}, {"_id": 0, "item_id": 1})
+    found = {doc["item_id"] async for doc in cursor}
+    return {"favorites": {item_id: item_id in found for item_id in batch.item_ids}}
+
 @api_router.delete("/favorites/{item_id}")
 async def remove_favorite(item_id: str):
     """Remove an item from favorites"""
@@ -675,10 +1636,36 @@ async def remove_favorite(item_id: str):
     return {"message": "تم الحذف من المفضلة"}
 
 @api_router.get("/favorites")
-async def get_favorites():
-    """Get all favorites"""
-    favorites = await db.favorites.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-    return {"favorites": favorites}
+async def get_favorites(limit: Optional[int] = Query(None, ge=1, le=1000), cursor: str = "", format: str = "json"):
+    """Get favorites, newest first
+
+    Pages hold ``limit`` items (100 by default) and return a ``next_cursor``.
+    With ``format=ndjson`` the favorites are streamed one JSON document per
+    line, without a limit unless one is given.
+    """
+    query = {}
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": last_id}},
+        ]
+    find = db.favorites.find(query, {"_id": 0}).sort([("created_at", -1), ("id", -1)])
+    
+    if format == "ndjson":
+        if limit:
+            find = find.limit(limit)
+        async def stream():
+            async for doc in find:
+                yield json.dumps(doc, ensure_ascii=False) + "\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
+    limit = limit or 100
+    favorites = await find.limit(limit).to_list(limit)
+    next_cursor = None
+    if len(favorites) == limit:
+        next_cursor = encode_cursor([favorites[-1]["created_at"], favorites[-1]["id"]])
+    return {"favorites": favorites, "next_cursor": next_cursor}
 
 @api_router.get("/favorites/check/{item_id}")
 async def check_favorite(item_id: str):
@@ -687,23 +1674,367 @@ async def check_favorite(item_id: str):
     return {"is_favorite": existing is not None}
 
 # Legacy routes
+# Insert attempts per buffered batch, with exponential backoff between them
+# (about a minute and a half in all before a batch is given up)
+WRITE_BEHIND_ATTEMPTS = 8
+WRITE_BEHIND_RETRY_SECONDS = 0.5
+WRITE_BEHIND_RETRY_MAX_SECONDS = 30.0
+
+class WriteBehindBuffer:
+    """Acknowledge writes immediately and insert them in batches.
+
+    A batch is flushed once it reaches ``max_batch`` documents or has waited
+    ``max_delay`` seconds. ``put`` blocks while ``max_pending`` documents are
+    queued, which pushes back on callers instead of growing without bound.
+    """
+
+    def __init__(self, collection: str, max_batch: int, max_delay: float, max_pending: int,
+                 after_flush: Optional[Callable[[List[dict]], None]] = None):
+        self.collection = collection
+        self.after_flush = after_flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = start_background_task(self._run())
+
+    async def put(self, doc: dict):
+        await self.queue.put(doc)
+
+    async def drain(self):
+        """Flush everything queued and stop the writer"""
+        if self._task is None:
+            return
+        await self.queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            doc = await self.queue.get()
+            if doc is None:
+                break
+            batch = [doc]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    doc = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if doc is None:
+                    stopping = True
+                    break
+                batch.append(doc)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]):
+        """Insert a batch, retrying with backoff while it is still owed to the database.
+
+        The queue keeps filling meanwhile, so a long outage ends up blocking
+        ``put`` at ``max_pending`` rather than dropping acknowledged writes.
+        """
+        written: List[dict] = []
+        pending = batch
+        delay = WRITE_BEHIND_RETRY_SECONDS
+        for attempt in range(1, WRITE_BEHIND_ATTEMPTS + 1):
+            try:
+                await db[self.collection].insert_many(pending, ordered=False)
+                written += pending
+                pending = []
+                break
+            except BulkWriteError as exc:
+                # insert_many assigned _ids in place: documents a failed attempt
+                # did write come back as duplicate keys, which count as written
+                failed = {error["index"] for error in exc.details["writeErrors"] if error.get("code") != 11000}
+                if exc.details.get("writeConcernErrors"):
+                    failed = set(range(len(pending)))
+                written += [doc for i, doc in enumerate(pending) if i not in failed]
+                pending = [pending[i] for i in sorted(failed)]
+                if not pending:
+                    break
+                error = exc
+            except PyMongoError as exc:
+                error = exc
+            if attempt < WRITE_BEHIND_ATTEMPTS:
+                logger.warning("Retrying %d buffered %s writes in %.1fs: %s",
+                               len(pending), self.collection, delay, error)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WRITE_BEHIND_RETRY_MAX_SECONDS)
+        if pending:
+            logger.error("Dropped %d buffered %s writes after %d attempts: %s",
+                         len(pending), self.collection, WRITE_BEHIND_ATTEMPTS, error)
+        if written and self.after_flush is not None:
+            self.after_flush(written)
+
+
+# Per-client heartbeat counts, pre-aggregated per minute and per hour
+ROLLUP_GRANULARITIES = {
+    "minute": lambda ts: ts.replace(second=0, microsecond=0),
+    "hour": lambda ts: ts.replace(minute=0, second=0, microsecond=0),
+}
+
+def count_status_rollups(docs: List[dict], counts: Dict[tuple, int]):
+    """Add status checks to per (granularity, client, bucket) counts"""
+    for doc in docs:
+        for granularity, truncate in ROLLUP_GRANULARITIES.items():
+            key = (granularity, doc["client_name"], truncate(doc["timestamp"]))
+            counts[key] = counts.get(key, 0) + 1
+
+async def write_status_rollups(counts: Dict[tuple, int]):
+    """Apply rollup counts with one batched $inc per bucket"""
+    if not counts:
+        return
+    await db.status_rollups.bulk_write([
+        UpdateOne({"granularity": granularity, "client_name": client_name, "bucket": bucket},
+                  {"$inc": {"count": count}}, upsert=True)
+        for (granularity, client_name, bucket), count in counts.items()
+    ], ordered=False)
+
+class StatusRollups:
+    """Fold status checks into status_rollups off the request path.
+
+    Checks are counted in memory and a background loop writes the counts
+    every ``flush_interval`` seconds, so a POST costs at most one write.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._counts: Dict[tuple, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, docs: List[dict]):
+        count_status_rollups(docs, self._counts)
+
+    async def flush(self):
+        counts, self._counts = self._counts, {}
+        try:
+            await write_status_rollups(counts)
+        except PyMongoError as exc:
+            # Keep the counts for the next flush rather than losing them
+            for key, count in counts.items():
+                self._counts[key] = self._counts.get(key, 0) + count
+            logger.error("Could not record %d status rollups: %s", len(counts), exc)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        self._task = start_background_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+status_rollups = StatusRollups(flush_interval=float(os.environ.get('STATUS_ROLLUP_FLUSH_SECONDS', '5')))
+
+# Checks from before live rollups started are rolled up once by a backfill; its
+# marker fixes that cutoff and records progress. Servers hold the backfill
+# through a lease of this many seconds so only one runs it at a time.
+STATUS_BACKFILL_MARKER = "status_rollups_backfill"
+STATUS_BACKFILL_LEASE = 300
+
+async def status_rollups_cutoff() -> datetime:
+    """Time from which checks are rolled up live, fixed by the first server to ask"""
+    try:
+        marker = await db.migrations.find_one_and_update(
+            {"_id": STATUS_BACKFILL_MARKER},
+            {"$setOnInsert": {"cutoff": datetime.now(timezone.utc), "done": False}},
+            upsert=True, return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        # Another server created the marker at the same moment
+        marker = await db.migrations.find_one({"_id": STATUS_BACKFILL_MARKER})
+    return marker["cutoff"]
+
+async def backfill_status_rollups(batch_size: int = 1000):
+    """Roll up status checks written before the live rollup cutoff, once.
+
+    Progress is saved after every batch, so an interrupted backfill resumes
+    where it stopped instead of counting checks twice.
+    """
+    now = datetime.now(timezone.utc)
+    owner = str(uuid.uuid4())
+    marker = await db.migrations.find_one_and_update(
+        {"_id": STATUS_BACKFILL_MARKER, "done": False,
+         "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+        {"$set": {"owner": owner, "lease_until": now + timedelta(seconds=STATUS_BACKFILL_LEASE)}},
+        return_document=ReturnDocument.AFTER)
+    if marker is None:
+        return
+
+    async def renew_lease() -> bool:
+        result = await db.migrations.update_one(
+            {"_id": STATUS_BACKFILL_MARKER, "owner": owner},
+            {"$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=STATUS_BACKFILL_LEASE)}})
+        return result.matched_count == 1
+
+    async def write_batch(batch: List[dict]):
+        counts: Dict[tuple, int] = {}
+        count_status_rollups(batch, counts)
+        await write_status_rollups(counts)
+        await db.migrations.update_one(
+            {"_id": STATUS_BACKFILL_MARKER, "owner": owner},
+            {"$set": {"progress": [batch[-1]["timestamp"], batch[-1]["id"]]}})
+
+    # Comparing with a date also leaves out any checks still stored with string timestamps
+    query = {"timestamp": {"$lt": marker["cutoff"]}}
+    if marker.get("progress"):
+        last_timestamp, last_id = marker["progress"]
+        query = {"$and": [query, {"$or": [
+            {"timestamp": {"$gt": last_timestamp}},
+            {"timestamp": last_timestamp, "id": {"$gt": last_id}},
+        ]}]}
+    find = db.status_checks.find(query, {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}) \
+        .sort([("timestamp", 1), ("id", 1)])
+    batch, total = [], 0
+    async for doc in find:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            if not await renew_lease():
+                logger.warning("Lost the status rollup backfill lease after %d checks", total)
+                return
+            await write_batch(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await write_batch(batch)
+        total += len(batch)
+    await db.migrations.update_one(
+        {"_id": STATUS_BACKFILL_MARKER, "owner": owner},
+        {"$set": {"done": True}, "$unset": {"owner": "", "lease_until": ""}})
+    if total:
+        logger.info("Backfilled status rollups from %d status checks", total)
+
+status_buffer: Optional[WriteBehindBuffer] = None
+if os.environ.get('STATUS_WRITE_BEHIND', '').lower() in ('1', 'true', 'yes'):
+    status_buffer = WriteBehindBuffer(
+        "status_checks",
+        max_batch=int(os.environ.get('STATUS_BATCH_SIZE', '500')),
+        max_delay=float(os.environ.get('STATUS_FLUSH_SECONDS', '1')),
+        max_pending=int(os.environ.get('STATUS_MAX_PENDING', '10000')),
+        after_flush=status_rollups.record,
+    )
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    _ = await db.status_checks.insert_one(doc)
+    if status_buffer is not None:
+        await status_buffer.put(doc)
+    else:
+        _ = await db.status_checks.insert_one(doc)
+        status_rollups.record([doc])
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
+async def get_status_checks(response: Response, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                            limit: int = Query(1000, ge=1, le=1000), cursor: str = ""):
+    """Get status checks in timestamp order, optionally within [since, until)
+
+    When more checks match, the cursor for the next page is returned in the
+    ``X-Next-Cursor`` header. Checks whose timestamp could not be migrated
+    from a string are left out, so every page ends on a date.
+    """
+    query = {"timestamp": {"$type": "date"}}
+    if since:
+        query["timestamp"]["$gte"] = since
+    if until:
+        query["timestamp"]["$lt"] = until
+    if cursor:
+        last_timestamp, last_id = decode_cursor(cursor, 2)
+        try:
+            last_timestamp = datetime.fromisoformat(last_timestamp)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="مؤشر الصفحة غير صالح")
+        query = {"$and": [query, {"$or": [
+            {"timestamp": {"$gt": last_timestamp}},
+            {"timestamp": last_timestamp, "id": {"$gt": last_id}},
+        ]}]}
+    find = db.status_checks.find(query, {"_id": 0}).sort([("timestamp", 1), ("id", 1)])
+    status_checks = await find.limit(limit).to_list(limit)
+    if len(status_checks) == limit:
+        last = status_checks[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last["timestamp"].isoformat(), last["id"]])
     return status_checks
 
+@api_router.get("/status/summary")
+async def get_status_summary(granularity: str = "hour", client_name: str = "",
+                             since: Optional[datetime] = None, until: Optional[datetime] = None,
+                             limit: int = Query(1000, ge=1, le=10000)):
+    """Get pre-aggregated status check counts per client and time bucket
+
+    Buckets overlapping [since, until) are returned, so the first and last
+    ones can include checks just outside the range. ``totals`` covers every
+    matching bucket, not only the ``limit`` returned.
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise HTTPException(status_code=400, detail="الدقة الزمنية غير مدعومة")
+    query = {"granularity": granularity}
+    if client_name:
+        query["client_name"] = client_name
+    if since or until:
+        query["bucket"] = {}
+        if since:
+            query["bucket"]["$gte"] = ROLLUP_GRANULARITIES[granularity](since)
+        if until:
+            query["bucket"]["$lt"] = until
+    rollups, sums = await asyncio.gather(
+        db.status_rollups.find(
+            query, {"_id": 0, "client_name": 1, "bucket": 1, "count": 1}
+        ).sort([("bucket", 1), ("client_name", 1)]).limit(limit).to_list(limit),
+        db.status_rollups.aggregate([
+            {"$match": query},
+            {"$group": {"_id": "$client_name", "count": {"$sum": "$count"}}},
+        ]).to_list(None),
+    )
+    totals = {row["_id"]: row["count"] for row in sums}
+    return {"granularity": granularity, "buckets": rollups, "totals": totals}
+
+async def migrate_status_timestamps(batch_size: int = 1000):
+    """Convert status checks stored with ISO string timestamps to BSON dates
+
+    Rows whose string cannot be parsed are logged and left as they are.
+    """
+    migrated = skipped = 0
+    requests = []
+    async for doc in db.status_checks.find({"timestamp": {"$type": "string"}}, {"timestamp": 1}):
+        try:
+            timestamp = datetime.fromisoformat(doc["timestamp"])
+        except ValueError:
+            skipped += 1
+            if skipped <= 10:
+                logger.warning("Status check %s has an unreadable timestamp %r", doc["_id"], doc["timestamp"])
+            continue
+        requests.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timestamp": timestamp}}))
+        if len(requests) >= batch_size:
+            await db.status_checks.bulk_write(requests, ordered=False)
+            migrated += len(requests)
+            requests = []
+    if requests:
+        await db.status_checks.bulk_write(requests, ordered=False)
+        migrated += len(requests)
+    if migrated:
+        logger.info("Migrated %d status check timestamps to dates", migrated)
+    if skipped:
+        logger.warning("Left %d status checks with unreadable timestamps", skipped)
+
+async def prepare_status_checks():
+    await migrate_status_timestamps()
+    await backfill_status_rollups()
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -713,6 +2044,8 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    # GET /api/status pages by returning its next cursor in a response header
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -724,4 +2057,9 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await catalog.stop()
+    await popularity.stop()
+    if status_buffer is not None:
+        await status_buffer.drain()
+    await status_rollups.stop()
     client.close()
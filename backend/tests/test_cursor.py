@@ -0,0 +1,30 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_cursor_round_trip():
+    values = ["2024-01-01T00:00:00+00:00", "abc"]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    raw_cursor([{"$gt": ""}, "z"]),
+    raw_cursor(["2024-01-01", {"$ne": None}]),
+    raw_cursor([1, "z"]),
+    raw_cursor(["only one"]),
+    raw_cursor({"created_at": "x", "id": "y"}),
+    "not base64 json",
+])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor, 2)
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,45 @@
+import pytest
+from fastapi import HTTPException
+
+from server import CategoryIndex, parse_genre_filter, seed_doc
+
+
+def make_index():
+    genres = ["RPG", "FPS", "RPG/أكشن", "أكشن", None, "FPS/RPG"]
+    docs = [seed_doc("games", {"name": f"game {i}", "name_ar": f"لعبة {i}", "genre": genre, "year": 2000 + i})
+            for i, genre in enumerate(genres)]
+    return CategoryIndex("games", docs)
+
+
+def names(index, ordinals):
+    return sorted(index.items[o]["name"] for o in ordinals)
+
+
+def test_parse_genre_filter():
+    assert parse_genre_filter("RPG") == (("RPG",), "any")
+    assert parse_genre_filter("RPG,FPS") == (("FPS", "RPG"), "any")
+    assert parse_genre_filter("RPG,FPS", "all") == (("FPS", "RPG"), "all")
+    # A compound genre names one kind of item, so it needs all of its parts
+    assert parse_genre_filter("RPG/أكشن") == (("RPG", "أكشن"), "all")
+    assert parse_genre_filter(" RPG , RPG/أكشن ") == (("RPG", "أكشن"), "any")
+    assert parse_genre_filter("") == ((), "any")
+    with pytest.raises(HTTPException):
+        parse_genre_filter("RPG", "some")
+
+
+def test_pool_any_and_all():
+    index = make_index()
+    assert names(index, index.pool()) == [f"game {i}" for i in range(6)]
+    assert names(index, index.pool(parse_genre_filter("RPG"))) == ["game 0", "game 2", "game 5"]
+    assert names(index, index.pool(parse_genre_filter("RPG,FPS"))) == ["game 0", "game 1", "game 2", "game 5"]
+    assert names(index, index.pool(parse_genre_filter("RPG,FPS", "all"))) == ["game 5"]
+    assert names(index, index.pool(parse_genre_filter("RPG/أكشن"))) == ["game 2"]
+    assert names(index, index.pool(parse_genre_filter("RPG,أكشن"))) == ["game 0", "game 2", "game 3", "game 5"]
+    assert list(index.pool(parse_genre_filter("strategy"))) == []
+
+
+def test_pool_with_years_and_search_use_the_genre_bitset():
+    index = make_index()
+    assert names(index, index.pool(parse_genre_filter("RPG,FPS"), (2001, 2004))) == ["game 1", "game 2"]
+    matches = index.search(["game"], parse_genre_filter("FPS"))
+    assert names(index, [o for _, o in matches]) == ["game 1", "game 5"]
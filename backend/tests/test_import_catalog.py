@@ -0,0 +1,19 @@
+import pytest
+
+from import_catalog import read_rows, to_document
+
+
+def test_malformed_json_line_is_an_invalid_row(tmp_path):
+    path = tmp_path / "items.jsonl"
+    path.write_text('{"name": "A", "name_ar": "أ"}\n{"name": \n[1, 2]\n', encoding="utf-8")
+    rows = list(read_rows(path))
+    assert len(rows) == 3
+    for row in rows[1:]:
+        with pytest.raises(ValueError):
+            to_document(row, "movies")
+
+
+@pytest.mark.parametrize("category", [["games"], {}, None, 1])
+def test_non_string_category_is_an_invalid_row(category):
+    with pytest.raises(ValueError):
+        to_document({"name": "A", "name_ar": "أ", "category": category}, "movies")
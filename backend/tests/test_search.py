@@ -0,0 +1,18 @@
+from server import CategoryIndex, seed_doc, search_tokens
+
+
+def make_index(names):
+    return CategoryIndex("games", [seed_doc("games", {"name": name, "name_ar": name}) for name in names])
+
+
+def test_best_match_is_ranked_before_any_cutoff():
+    index = make_index([f"b a{i:03}" for i in range(300)] + ["azz"])
+    (_, best), *_ = index.search(search_tokens("a"), limit=5)
+    assert index.items[best]["name"] == "azz"
+
+
+def test_complete_tokens_intersect():
+    index = make_index(["red dead redemption", "red letter media", "dead space", "the red dead"])
+    names = sorted(index.items[o]["name"] for _, o in index.search(search_tokens("red dead r")))
+    assert names == ["red dead redemption", "the red dead"]
+    assert index.search(search_tokens("dead red x")) == []
@@ -0,0 +1,49 @@
+import base64
+import random
+import time
+import zlib
+
+from server import SEEN_BITSET, CategoryIndex, decode_seen, encode_seen
+
+
+def make_index(size):
+    return CategoryIndex("games", [
+        {"id": f"{i:07d}", "name": f"Game {i}", "name_ar": "لعبة", "category": "games"}
+        for i in range(size)
+    ])
+
+
+def raw_token(index, kind, payload):
+    raw = index.version + bytes([kind]) + payload
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def test_round_trip_sparse_and_dense():
+    index = make_index(5000)
+    for ordinals in (set(), {0}, {4999}, set(random.sample(range(5000), 40)), set(range(0, 5000, 2))):
+        assert decode_seen(index, encode_seen(index, ordinals)) == ordinals
+
+
+def test_token_from_another_catalog_is_ignored():
+    token = encode_seen(make_index(100), {1, 2, 3})
+    assert decode_seen(make_index(101), token) == set()
+
+
+def test_malformed_tokens_decode_empty():
+    index = make_index(100)
+    assert decode_seen(index, "not a token!!") == set()
+    assert decode_seen(index, raw_token(index, SEEN_BITSET, b"garbage")) == set()
+
+
+def test_decompression_bomb_is_rejected_quickly():
+    index = make_index(100)
+    token = raw_token(index, SEEN_BITSET, zlib.compress(b"\xff" * 8_000_000, 9))
+    started = time.perf_counter()
+    assert decode_seen(index, token) == set()
+    assert time.perf_counter() - started < 0.1
+
+
+def test_bits_past_the_catalog_are_dropped():
+    index = make_index(10)
+    token = raw_token(index, SEEN_BITSET, zlib.compress(b"\xff\xff"))
+    assert decode_seen(index, token) == set(range(10))
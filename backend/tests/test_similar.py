@@ -0,0 +1,21 @@
+from server import CategoryIndex, seed_doc
+
+
+def test_similar_scores_genre_overlap_plus_year_closeness():
+    rows = [
+        ("Base", "RPG/أكشن", 2010),
+        ("Same genres, near", "أكشن/RPG", 2011),
+        ("Same genres, far", "RPG/أكشن", 1990),
+        ("One genre, same year", "RPG", 2010),
+        ("Other genre, same year", "FPS", 2010),
+        ("Same genres, undated", "RPG/أكشن", None),
+    ]
+    docs = [seed_doc("games", {"name": name, "name_ar": name, "genre": genre, "year": year})
+            for name, genre, year in rows]
+    index = CategoryIndex("games", docs)
+    base = index.ordinals[docs[0]["id"]]
+    names = [index.items[o]["name"] for o in index.similar(base, 5)]
+    # A shared genre (0.71) in the same year (+0.3) edges out all genres 20 years apart
+    assert names == ["Same genres, near", "One genre, same year", "Same genres, far",
+                     "Same genres, undated", "Other genre, same year"]
+    assert len(index.similar(base, 50)) == 5
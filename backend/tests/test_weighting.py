@@ -0,0 +1,64 @@
+import asyncio
+import collections
+
+from server import AliasTable, CategoryIndex, parse_genre_filter, seed_doc
+
+
+def test_alias_table_matches_weights():
+    table = AliasTable([1.0, 2.0, 3.0, 4.0])
+    counts = collections.Counter(table.sample() for _ in range(100_000))
+    for position, weight in enumerate([1, 2, 3, 4]):
+        assert abs(counts[position] / 100_000 - weight / 10) < 0.01
+
+
+def test_editorial_weight_survives_seeding():
+    docs = [
+        seed_doc("games", {"name": "Heavy", "name_ar": "ثقيل", "weight": 9}),
+        seed_doc("games", {"name": "Light", "name_ar": "خفيف"}),
+    ]
+    index = CategoryIndex("games", docs)
+    weights = index.weights["editorial"]
+    heavy = index.ordinals[docs[0]["id"]]
+    assert weights[heavy] == 9.0
+    assert weights[1 - heavy] == 1.0
+
+    counts = collections.Counter(
+        index.pick_many_weighted(index.pool(), ((), (None, None)), set(), 1, "editorial")[0]
+        for _ in range(10_000)
+    )
+    assert counts[heavy] > 8 * counts[1 - heavy] * 0.8
+
+
+def test_update_weights_rebuilds_cached_tables():
+    docs = [seed_doc("games", {"name": name, "name_ar": name}) for name in ("A", "B")]
+    index = CategoryIndex("games", docs)
+    pool_key = (((), "any"), (None, None))
+    before = index.alias_table("popularity", index.pool(), pool_key)
+    asyncio.run(index.update_weights("popularity", {0: 99.0}))
+    after = index.alias_table("popularity", index.pool(), pool_key)
+    assert after is not before
+    assert index.weights["popularity"] == [99.0, 1.0]
+    counts = collections.Counter(after.sample() for _ in range(10_000))
+    assert counts[0] > 90 * counts[1] * 0.8
+
+
+def test_update_weights_skips_tables_without_changed_items():
+    docs = [
+        seed_doc("games", {"name": "A", "name_ar": "أ", "genre": "RPG", "year": 1995}),
+        seed_doc("games", {"name": "B", "name_ar": "ب", "genre": "Action", "year": 2005}),
+    ]
+    index = CategoryIndex("games", docs)
+    rpg = index.ordinals[docs[0]["id"]]
+    keys = {
+        "rpg": (parse_genre_filter("RPG"), (None, None)),
+        "action": (parse_genre_filter("Action"), (None, None)),
+        "nineties": (((), "any"), (1990, 1999)),
+        "noughties": (((), "any"), (2000, 2009)),
+    }
+    before = {name: index.alias_table("popularity", index.pool(*key), key) for name, key in keys.items()}
+    asyncio.run(index.update_weights("popularity", {rpg: 5.0}))
+    after = {name: index.alias_table("popularity", index.pool(*key), key) for name, key in keys.items()}
+    assert after["rpg"] is not before["rpg"]
+    assert after["nineties"] is not before["nineties"]
+    assert after["action"] is before["action"]
+    assert after["noughties"] is before["noughties"]
@@ -0,0 +1,62 @@
+import asyncio
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+
+
+class FlakyCollection:
+    """Fails the first inserts it is given, then stores documents by _id"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.docs = {}
+
+    async def insert_many(self, docs, ordered=True):
+        for i, doc in enumerate(docs):
+            doc.setdefault("_id", (doc["id"], i))
+        failure = self.failures.pop(0) if self.failures else None
+        if failure == "down":
+            raise AutoReconnect("connection refused")
+        errors = []
+        for i, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": i, "code": 11000, "errmsg": "duplicate key"})
+            elif failure == "partial" and i % 2:
+                errors.append({"index": i, "code": 91, "errmsg": "shutting down"})
+            else:
+                self.docs[doc["_id"]] = doc
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": []})
+
+
+def flush(monkeypatch, failures, docs):
+    collection = FlakyCollection(failures)
+    monkeypatch.setattr(server, "db", {"checks": collection})
+    monkeypatch.setattr(server, "WRITE_BEHIND_RETRY_SECONDS", 0)
+    flushed = []
+    buffer = server.WriteBehindBuffer("checks", max_batch=10, max_delay=1, max_pending=10,
+                                      after_flush=flushed.extend)
+    asyncio.run(buffer._flush(docs))
+    return collection, flushed
+
+
+def test_flush_retries_after_an_outage(monkeypatch):
+    docs = [{"id": str(i)} for i in range(4)]
+    collection, flushed = flush(monkeypatch, ["down", "down"], docs)
+    assert len(collection.docs) == 4
+    assert flushed == docs
+
+
+def test_flush_retries_only_failed_documents(monkeypatch):
+    docs = [{"id": str(i)} for i in range(4)]
+    collection, flushed = flush(monkeypatch, ["partial"], docs)
+    assert len(collection.docs) == 4
+    assert sorted(doc["id"] for doc in flushed) == ["0", "1", "2", "3"]
+
+
+def test_flush_gives_up_after_the_last_attempt(monkeypatch):
+    docs = [{"id": "0"}]
+    collection, flushed = flush(monkeypatch, ["down"] * server.WRITE_BEHIND_ATTEMPTS, docs)
+    assert collection.docs == {}
+    assert flushed == []
@@ -0,0 +1,42 @@
+from server import CategoryIndex, parse_genre_filter, parse_year_range, seed_doc
+
+
+def make_index():
+    years = [1985, 1990, 1994, 1999, 2000, None, 1990]
+    genres = ["RPG", "FPS", "RPG", "FPS/RPG", "RPG", "RPG", "أكشن"]
+    docs = [seed_doc("games", {"name": f"game {i}", "name_ar": f"لعبة {i}", "genre": genre, "year": year})
+            for i, (year, genre) in enumerate(zip(years, genres))]
+    return CategoryIndex("games", docs)
+
+
+def years(index, ordinals):
+    return sorted(index.items[o]["year"] for o in ordinals)
+
+
+def test_parse_year_range():
+    assert parse_year_range(None, None, None) == (None, None)
+    assert parse_year_range(1990, None, None) == (1990, None)
+    assert parse_year_range(None, None, 1995) == (1990, 1999)
+    # Explicit bounds narrow the decade but never widen it
+    assert parse_year_range(1993, 2010, 1990) == (1993, 1999)
+    assert parse_year_range(1980, 1995, 1990) == (1990, 1995)
+    assert parse_year_range(2000, 1990, None) == (2000, 1990)
+
+
+def test_year_slice():
+    index = make_index()
+    assert years(index, index.year_slice((None, None))) == [1985, 1990, 1990, 1994, 1999, 2000]
+    assert years(index, index.year_slice((1990, 1999))) == [1990, 1990, 1994, 1999]
+    assert years(index, index.year_slice((1991, None))) == [1994, 1999, 2000]
+    assert years(index, index.year_slice((None, 1989))) == [1985]
+    assert list(index.year_slice((2000, 1990))) == []
+    assert list(index.year_slice(parse_year_range(None, None, 1970))) == []
+
+
+def test_pool_with_genre_and_years():
+    index = make_index()
+    rpg = parse_genre_filter("RPG")
+    assert years(index, index.pool(rpg, (1990, 1999))) == [1994, 1999]
+    assert years(index, index.pool(rpg, (1990, None))) == [1994, 1999, 2000]
+    assert years(index, index.pool(parse_genre_filter("أكشن,FPS"), parse_year_range(None, None, 1990))) == [1990, 1990, 1999]
+    assert list(index.pool(rpg, (2000, 1990))) == []